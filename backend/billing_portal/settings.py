@@ -4,56 +4,73 @@ Django settings for billing_portal project.
 
 from pathlib import Path
 import os
+import sys
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
-load_dotenv()
+# Parse .env once per process tree: child processes (autoreloader, forked
+# workers) inherit the loaded variables, and deployments that inject the
+# environment directly can set DJANGO_ENV_LOADED=1 to skip the file entirely.
+# Bound once; all settings below read the environment through env()
+env = os.environ.get
+
+if env('DJANGO_ENV_LOADED') != '1':
+    load_dotenv()
+    os.environ['DJANGO_ENV_LOADED'] = '1'
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Management commands that don't need environment validation. Checked before
+# importing startup_validation so these commands never load the module at all.
+VALIDATION_SKIP_COMMANDS = frozenset({
+    'migrate',
+    'makemigrations',
+    'collectstatic',
+    'validate_env',
+    'help',
+    '--help',
+    'shell',
+    'test',
+})
+
 # Validate environment variables when settings are loaded
 # This ensures validation runs early in the Django startup process
-try:
-    from .startup_validation import validate_startup
-    # Only validate if not running migrations or other setup commands
-    # (check by looking for common management commands)
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] not in ['migrate', 'makemigrations', 'collectstatic', 'validate_env']:
+if len(sys.argv) > 1 and sys.argv[1] not in VALIDATION_SKIP_COMMANDS:
+    try:
+        from .startup_validation import validate_startup
         validate_startup(fail_fast=False)  # Don't fail fast in settings - let WSGI handle it
-except ImportError:
-    # If validation module doesn't exist, continue without validation
-    pass
-except Exception:
-    # Don't block settings loading if validation fails
-    pass
+    except Exception:
+        # Don't block settings loading if validation fails
+        pass
 
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'django-insecure-change-in-production')
+SECRET_KEY = env('DJANGO_SECRET_KEY', 'django-insecure-change-in-production')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.getenv('DEBUG', 'True') == 'True'
+DEBUG = env('DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = ['*']  # In production, specify actual hosts
 
 
 # Application definition
 
+# The Django admin (and the messages/staticfiles apps it needs) can be left
+# out of API-only deployments with ENABLE_ADMIN=0
+ENABLE_ADMIN = env('ENABLE_ADMIN', '1') == '1'
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
     'rest_framework',
-    'rest_framework_simplejwt',  # JWT authentication
-    'rest_framework_simplejwt.token_blacklist',  # JWT token blacklist
+    'rest_framework_simplejwt',  # JWT authentication (blacklist lives in the cache, see users.authentication)
     'corsheaders',
-    'dj_db_conn_pool',  # Database connection pooling
     'users',
 ]
 
@@ -62,14 +79,20 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'users.middleware.DisableCSRFForAPI',  # Custom middleware to disable CSRF for API
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-# Disable CSRF for API endpoints
+if ENABLE_ADMIN:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
+    INSTALLED_APPS += ['django.contrib.messages', 'django.contrib.staticfiles']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+        'django.contrib.messages.middleware.MessageMiddleware',
+    )
+
+# API endpoints authenticate with JWT (no CSRF checks); CSRF only applies to admin
 CSRF_COOKIE_SECURE = False
 CSRF_USE_SESSIONS = False
 
@@ -79,14 +102,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory; the dev autoreloader
+            # resets this cache when a template changes
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
+            ] + (['django.contrib.messages.context_processors.messages'] if ENABLE_ADMIN else []),
         },
     },
 ]
@@ -98,23 +127,70 @@ WSGI_APPLICATION = 'billing_portal.wsgi.application'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
 # Database connection pooling configuration
-# Using django-db-connection-pool for connection pooling
+# Using django-db-connection-pool for connection pooling.
+# Each worker process owns its own pool, so the defaults are derived from the
+# Postgres connection limit divided across workers (keeping a reserve for
+# admin/maintenance connections): POOL_SIZE is the steady-state size and
+# POOL_SIZE + MAX_OVERFLOW the per-process ceiling. The ceiling is capped at
+# DB_POOL_MAX_PER_PROCESS: past ~25 connections Postgres throughput stops
+# improving, so large servers shouldn't hand each worker hundreds. Small
+# servers get whatever share fits, down to a single connection per worker.
+GUNICORN_WORKERS = max(1, int(env('GUNICORN_WORKERS', '4')))
+PG_MAX_CONNECTIONS = int(env('PG_MAX_CONNECTIONS', '100'))
+PG_RESERVED_CONNECTIONS = 10
+DB_POOL_MAX_PER_PROCESS = 25
+# Connections each worker may open without the workers together exceeding
+# max_connections; the pool ceiling must fit in it
+_db_pool_share = (PG_MAX_CONNECTIONS - PG_RESERVED_CONNECTIONS) // GUNICORN_WORKERS
+_db_pool_budget = min(DB_POOL_MAX_PER_PROCESS, _db_pool_share)
+DB_POOL_MAX_OVERFLOW = int(env('DB_POOL_MAX_OVERFLOW', str(_db_pool_budget // 4)))
+DB_POOL_SIZE = int(env('DB_POOL_SIZE', str(max(1, _db_pool_budget - DB_POOL_MAX_OVERFLOW))))
+if DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW > _db_pool_share:
+    raise ImproperlyConfigured(
+        f'DB pool of {DB_POOL_SIZE} + {DB_POOL_MAX_OVERFLOW} overflow connections per worker '
+        f'exceeds the {_db_pool_share} that fit {GUNICORN_WORKERS} worker(s) into '
+        f'PG_MAX_CONNECTIONS={PG_MAX_CONNECTIONS} (minus {PG_RESERVED_CONNECTIONS} reserved); '
+        'lower DB_POOL_SIZE/DB_POOL_MAX_OVERFLOW or GUNICORN_WORKERS, or raise PG_MAX_CONNECTIONS'
+    )
+
+# Short-lived management commands that don't benefit from a connection pool
+# use the plain Postgres backend and skip loading SQLAlchemy entirely
+DB_POOL_SKIP_COMMANDS = frozenset({
+    'help',
+    '--help',
+    'collectstatic',
+    'validate_env',
+    'check',
+    'startapp',
+    'makemigrations',
+})
+USE_DB_POOL = not (len(sys.argv) > 1 and sys.argv[1] in DB_POOL_SKIP_COMMANDS)
+if USE_DB_POOL:
+    INSTALLED_APPS.append('dj_db_conn_pool')  # Database connection pooling
+
 DATABASES = {
     'default': {
-        'ENGINE': 'dj_db_conn_pool.backends.postgresql',
-        'NAME': os.getenv('DB_NAME', 'billing_portal'),
-        'USER': os.getenv('DB_USER', 'postgres'),
-        'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
-        'HOST': os.getenv('DB_HOST', 'db'),
-        'PORT': os.getenv('DB_PORT', '5432'),
+        'ENGINE': 'dj_db_conn_pool.backends.postgresql' if USE_DB_POOL else 'django.db.backends.postgresql',
+        'NAME': env('DB_NAME', 'billing_portal'),
+        'USER': env('DB_USER', 'postgres'),
+        'PASSWORD': env('DB_PASSWORD', 'postgres'),
+        'HOST': env('DB_HOST', 'db'),
+        'PORT': env('DB_PORT', '5432'),
         # Connection pool settings (django-db-connection-pool format)
         'POOL_OPTIONS': {
-            'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', '20')),  # Maximum connections in pool
-            'MAX_OVERFLOW': int(os.getenv('DB_POOL_MAX_OVERFLOW', '10')),  # Max overflow connections
-            'POOL_RECYCLE': int(os.getenv('DB_POOL_RECYCLE', '3600')),  # Recycle connections after 1 hour
-            'POOL_PRE_PING': True,  # Verify connections before using
+            'POOL_SIZE': DB_POOL_SIZE,  # Persistent connections per process
+            'MAX_OVERFLOW': DB_POOL_MAX_OVERFLOW,  # Extra connections allowed under burst
+            'POOL_RECYCLE': int(env('DB_POOL_RECYCLE', '3600')),  # Recycle connections after 1 hour
+            # Ping each connection on checkout. POOL_RECYCLE only bounds age, so
+            # without this a connection dropped by a server/PgBouncer idle
+            # timeout or a failover surfaces as an error in the request
+            'POOL_PRE_PING': env('DB_POOL_PRE_PING', 'True') == 'True',
         },
-        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),  # Reuse connections for 10 minutes
+        # The pool owns connection lifetime: Django hands the connection back
+        # at the end of each request instead of pinning it for CONN_MAX_AGE
+        'CONN_MAX_AGE': 0,
+        # Required when running behind PgBouncer in transaction pooling mode
+        'DISABLE_SERVER_SIDE_CURSORS': env('DB_DISABLE_SERVER_SIDE_CURSORS', 'False') == 'True',
     }
 }
 
@@ -145,7 +221,7 @@ LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
 
-USE_I18N = True
+USE_I18N = False  # English-only portal; no translation catalogs to load
 
 USE_TZ = True
 
@@ -171,6 +247,10 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# The dashboard sends an Idempotency-Key with plan changes (see
+# SubscriptionService.handle_subscription_update)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
 # CSRF Settings
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
@@ -180,11 +260,30 @@ CSRF_TRUSTED_ORIGINS = [
 CSRF_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_SAMESITE = 'Lax'
 
+# Cache Configuration
+# Redis when REDIS_URL is set (shared across workers), otherwise per-process
+# memory. The JWT blacklist, plan-change locks and status invalidation rely on
+# a shared cache, so startup validation requires REDIS_URL when DEBUG is off
+REDIS_URL = env('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Session Configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Store sessions in database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'  # Read through cache, persist to database
 SESSION_COOKIE_AGE = 86400  # 24 hours (in seconds)
 SESSION_COOKIE_HTTPONLY = True  # Prevent JavaScript access to session cookie
-SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'False') == 'True'  # HTTPS only in production
+SESSION_COOKIE_SECURE = env('SESSION_COOKIE_SECURE', 'False') == 'True'  # HTTPS only in production
 SESSION_SAVE_EVERY_REQUEST = False  # Only save session when modified
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False  # Persist session after browser close
 
@@ -192,21 +291,26 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = False  # Persist session after browser close
 DATABASE_TRANSACTION_ISOLATION_LEVEL = 'read committed'  # PostgreSQL default
 
 # Stripe Configuration
-STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
-STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
-STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', '')
-STRIPE_BASIC_PLAN_PRICE_ID = os.getenv('STRIPE_BASIC_PLAN_PRICE_ID', '')
-STRIPE_PRO_PLAN_PRICE_ID = os.getenv('STRIPE_PRO_PLAN_PRICE_ID', '')
+STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY', '')
+STRIPE_PUBLISHABLE_KEY = env('STRIPE_PUBLISHABLE_KEY', '')
+STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET', '')
+STRIPE_BASIC_PLAN_PRICE_ID = env('STRIPE_BASIC_PLAN_PRICE_ID', '')
+STRIPE_PRO_PLAN_PRICE_ID = env('STRIPE_PRO_PLAN_PRICE_ID', '')
 
 # REST Framework
 REST_FRAMEWORK = {
+    # JWT only: no per-request session lookup or CSRF check on API calls
+    # (the Django admin authenticates through its own session middleware)
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.SessionAuthentication',  # Fallback for admin
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'users.renderers.ORJSONRenderer',  # orjson instead of stdlib json
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': None,  # Disable pagination for now
 }
 
@@ -214,7 +318,9 @@ REST_FRAMEWORK = {
 from datetime import timedelta
 
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),  # Access token valid for 1 hour
+    # Short-lived access tokens expire on their own, so only refresh tokens are
+    # checked against the blacklist (see users.authentication)
+    'ACCESS_TOKEN_LIFETIME': timedelta(seconds=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),  # Refresh token valid for 7 days
     'ROTATE_REFRESH_TOKENS': True,  # Rotate refresh token on each use
     'BLACKLIST_AFTER_ROTATION': True,  # Blacklist old tokens after rotation
@@ -231,7 +337,7 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
     
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),  # Signature + expiry only
     'TOKEN_TYPE_CLAIM': 'token_type',
     
     'JTI_CLAIM': 'jti',
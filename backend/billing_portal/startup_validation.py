@@ -10,13 +10,48 @@ preventing the application from starting in an invalid state.
 import os
 import sys
 import logging
-from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 # Track if validation has already run to avoid duplicate checks
 _validation_run = False
 
+# Set in the environment after a successful validation so forked workers
+# and child processes inherit it and skip re-validating
+_VALIDATED_ENV_VAR = '_BILLING_PORTAL_VALIDATED'
+
+_DEFAULT_SECRET_KEY = 'django-insecure-change-in-production'
+
+# Environment schema: (var, description, required, accepted prefixes).
+# Missing required variables are errors; missing optional ones are warnings
+# (the app can run without Stripe). Prefixes are only checked when set.
+_ENV_SCHEMA: tuple[tuple[str, str, bool, tuple[str, ...]], ...] = (
+    ('DB_NAME', 'Database name', True, ()),
+    ('DB_USER', 'Database user', True, ()),
+    ('DB_PASSWORD', 'Database password', True, ()),
+    ('DB_HOST', 'Database host', True, ()),
+    ('STRIPE_SECRET_KEY', 'Stripe API secret key', False, ('sk_test_', 'sk_live_')),
+    ('STRIPE_PUBLISHABLE_KEY', 'Stripe publishable key', False, ('pk_test_', 'pk_live_')),
+    ('STRIPE_WEBHOOK_SECRET', 'Stripe webhook signing secret', False, ('whsec_',)),
+    ('STRIPE_BASIC_PLAN_PRICE_ID', 'Basic plan price ID', False, ()),
+    ('STRIPE_PRO_PLAN_PRICE_ID', 'Pro plan price ID', False, ()),
+)
+
+# Schema with messages prebuilt at import time:
+# (var, required, missing message, accepted prefixes, format message)
+_ENV_CHECKS: tuple[tuple[str, bool, str, tuple[str, ...], str], ...] = tuple(
+    (
+        var,
+        required,
+        f'Missing required environment variable: {var} ({description})' if required
+        else f'Missing {var}: {description} (subscription features will not work)',
+        prefixes,
+        f'{var} format may be incorrect (should start with '
+        + ' or '.join(f'"{prefix}"' for prefix in prefixes) + ')' if prefixes else '',
+    )
+    for var, description, required, prefixes in _ENV_SCHEMA
+)
+
 
 def validate_environment() -> list[str]:
     """
@@ -32,68 +67,44 @@ def validate_environment() -> list[str]:
     """
     errors: list[str] = []
     warnings: list[str] = []
+    env_get = os.environ.get
     
-    # Critical: Database configuration
-    required_db_vars = {
-        'DB_NAME': 'Database name',
-        'DB_USER': 'Database user',
-        'DB_PASSWORD': 'Database password',
-        'DB_HOST': 'Database host',
-    }
-    for var, description in required_db_vars.items():
-        if not validate_required_env_var(var, description):
-            errors.append(f'Missing required database variable: {var} ({description})')
+    for var, required, missing_message, prefixes, format_message in _ENV_CHECKS:
+        value = env_get(var)
+        if not value:
+            (errors if required else warnings).append(missing_message)
+        elif prefixes and not value.startswith(prefixes):
+            warnings.append(format_message)
     
     # Critical: Django secret key (should not be default in production)
-    secret_key = os.getenv('DJANGO_SECRET_KEY', '')
-    is_debug = os.getenv('DEBUG', 'True') == 'True'
+    secret_key = env_get('DJANGO_SECRET_KEY', '')
+    is_debug = env_get('DEBUG', 'True') == 'True'
     
-    if not secret_key or secret_key == 'django-insecure-change-in-production':
+    if not secret_key or secret_key == _DEFAULT_SECRET_KEY:
         if is_debug:
             warnings.append('Using default SECRET_KEY (OK for development, but change for production)')
         else:
             errors.append('SECRET_KEY must be set in production (cannot use default value)')
     
-    # Validate Stripe configuration format if provided
-    stripe_secret = os.getenv('STRIPE_SECRET_KEY', '')
-    if stripe_secret:
-        if not validate_env_var_format('STRIPE_SECRET_KEY', 'sk_test_', 'Stripe secret key'):
-            warnings.append('STRIPE_SECRET_KEY format may be incorrect (should start with "sk_test_" or "sk_live_")')
-    
-    stripe_publishable = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
-    if stripe_publishable:
-        if not validate_env_var_format('STRIPE_PUBLISHABLE_KEY', 'pk_test_', 'Stripe publishable key'):
-            warnings.append('STRIPE_PUBLISHABLE_KEY format may be incorrect (should start with "pk_test_" or "pk_live_")')
-    
-    stripe_webhook = os.getenv('STRIPE_WEBHOOK_SECRET', '')
-    if stripe_webhook:
-        if not validate_env_var_format('STRIPE_WEBHOOK_SECRET', 'whsec_', 'Stripe webhook secret'):
-            warnings.append('STRIPE_WEBHOOK_SECRET format may be incorrect (should start with "whsec_")')
-    
-    # Important: Stripe configuration (warnings, not errors - app can run without Stripe)
-    stripe_vars = {
-        'STRIPE_SECRET_KEY': 'Stripe API secret key',
-        'STRIPE_PUBLISHABLE_KEY': 'Stripe publishable key',
-        'STRIPE_WEBHOOK_SECRET': 'Stripe webhook signing secret',
-        'STRIPE_BASIC_PLAN_PRICE_ID': 'Basic plan price ID',
-        'STRIPE_PRO_PLAN_PRICE_ID': 'Pro plan price ID',
-    }
-    
-    for var, description in stripe_vars.items():
-        if not os.getenv(var):
-            warnings.append(f'Missing {var}: {description} (subscription features will not work)')
+    # Critical: the cache holds the JWT blacklist, per-user locks and status
+    # invalidations, which only work across workers on a shared Redis cache
+    if not env_get('REDIS_URL'):
+        if is_debug:
+            warnings.append('REDIS_URL not set, using a per-process cache (OK for a single dev server)')
+        else:
+            errors.append('REDIS_URL must be set in production (the fallback cache is per-process)')
     
     # Log warnings
     if warnings:
         logger.warning('Configuration warnings:')
         for warning in warnings:
-            logger.warning(f'  - {warning}')
+            logger.warning('  - %s', warning)
     
     # Log errors
     if errors:
         logger.error('Configuration errors:')
         for error in errors:
-            logger.error(f'  - {error}')
+            logger.error('  - %s', error)
     
     return errors
 
@@ -113,8 +124,8 @@ def validate_startup(fail_fast: bool = True) -> bool:
     """
     global _validation_run
     
-    # Only run validation once per process
-    if _validation_run:
+    # Only run validation once per process (or once per process tree)
+    if _validation_run or os.environ.get(_VALIDATED_ENV_VAR) == '1':
         return True
     
     _validation_run = True
@@ -140,51 +151,7 @@ def validate_startup(fail_fast: bool = True) -> bool:
         
         return False
     
+    os.environ[_VALIDATED_ENV_VAR] = '1'
     logger.info('✓ Environment validation passed')
     return True
 
-
-def validate_required_env_var(var_name: str, description: Optional[str] = None) -> bool:
-    """
-    Validate that a required environment variable is set.
-    
-    Args:
-        var_name: Name of the environment variable
-        description: Optional description of what the variable is for
-        
-    Returns:
-        bool: True if variable is set, False otherwise
-    """
-    value = os.getenv(var_name)
-    if not value:
-        desc = f' ({description})' if description else ''
-        logger.error(f'Missing required environment variable: {var_name}{desc}')
-        return False
-    return True
-
-
-def validate_env_var_format(var_name: str, expected_prefix: str, description: str) -> bool:
-    """
-    Validate that an environment variable has the expected format.
-    
-    Args:
-        var_name: Name of the environment variable
-        expected_prefix: Expected prefix (e.g., 'sk_test_', 'cus_')
-        description: Description of what the variable should contain
-        
-    Returns:
-        bool: True if variable is set and has correct format, False otherwise
-    """
-    value = os.getenv(var_name)
-    if not value:
-        return False
-    
-    if not value.startswith(expected_prefix):
-        logger.warning(
-            f'Environment variable {var_name} may have incorrect format. '
-            f'Expected to start with "{expected_prefix}" but got "{value[:20]}..."'
-        )
-        return False
-    
-    return True
-
@@ -1,11 +1,15 @@
 """
 URL configuration for billing_portal project.
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('users.urls')),
 ]
 
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
@@ -12,4 +12,12 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('subscription_status', 'current_plan', 'total_amount_paid', 'stripe_customer_id', 'stripe_subscription_id')
         }),
     )
+    # Columns fetched for the changelist; the change form still loads full rows
+    changelist_fields = ('id',) + list_display
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name == f'{self.opts.app_label}_{self.opts.model_name}_changelist':
+            queryset = queryset.only(*self.changelist_fields)
+        return queryset
@@ -0,0 +1,65 @@
+"""
+JWT refresh token class with a cache-backed blacklist.
+
+Blacklisted token IDs (jti) are stored in the Django cache (Redis in
+production) with a TTL matching the token's remaining lifetime, replacing
+simplejwt's OutstandingToken/BlacklistedToken database tables. Access tokens
+are short-lived (see SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']) and are never
+blacklisted, so authenticated requests do no blacklist lookup at all.
+
+Refresh tokens are checked against the cache on every use, so a token
+revoked by any worker is rejected by all of them immediately. This relies on
+the cache being shared (Redis), which startup validation enforces outside
+DEBUG; the per-process fallback only suits a single development server.
+"""
+import time
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt import tokens
+
+
+def _blacklist_cache_key(jti: str) -> str:
+    """Cache key marking a token ID as blacklisted."""
+    return f'jwt:bl:{jti}'
+
+
+class CacheBlacklistMixin:
+    """
+    Token mixin that checks and records blacklisting in the cache.
+
+    Entries expire together with the token, so the blacklist never holds
+    tokens that would be rejected as expired anyway.
+    """
+
+    def verify(self, *args, **kwargs) -> None:
+        """
+        Verify the token, rejecting it if blacklisted.
+
+        Raises:
+            TokenError: If the token is blacklisted, expired or invalid
+        """
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+
+    def check_blacklist(self) -> None:
+        """
+        Check whether this token has been blacklisted.
+
+        Raises:
+            TokenError: If the token is blacklisted
+        """
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if cache.get(_blacklist_cache_key(jti)) is not None:
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self) -> None:
+        """Blacklist this token for the rest of its lifetime."""
+        jti = self.payload[api_settings.JTI_CLAIM]
+        ttl = self.payload['exp'] - int(time.time())
+        if ttl > 0:
+            cache.set(_blacklist_cache_key(jti), 1, ttl)
+
+
+class RefreshToken(CacheBlacklistMixin, tokens.RefreshToken):
+    """Refresh token that can be revoked on logout."""
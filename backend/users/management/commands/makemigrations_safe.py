@@ -7,6 +7,7 @@ helpful information about what will be migrated.
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from django.db import connection
+from django.db.migrations.loader import MigrationLoader
 import sys
 
 
@@ -50,8 +51,14 @@ class Command(BaseCommand):
         # Check for unapplied migrations
         self.stdout.write('\nChecking for unapplied migrations...')
         try:
-            call_command('showmigrations', '--list', verbosity=0)
-            self.stdout.write(self.style.SUCCESS('✓ Migration status checked'))
+            loader = MigrationLoader(connection)
+            unapplied = [node for node in loader.graph.nodes if node not in loader.applied_migrations]
+            if unapplied:
+                self.stdout.write(self.style.WARNING(f'⚠ {len(unapplied)} unapplied migration(s):'))
+                for app, name in sorted(unapplied):
+                    self.stdout.write(f'  - {app}.{name}')
+            else:
+                self.stdout.write(self.style.SUCCESS('✓ Migration status checked'))
         except Exception as e:
             self.stdout.write(self.style.WARNING(f'Warning: {e}'))
 
@@ -0,0 +1,84 @@
+"""
+Management command to backfill subscription data from Stripe.
+Usage: python manage.py sync_subscriptions [--batch-size N]
+"""
+from django.core.management.base import BaseCommand
+from users.utils.constants import ACTIVE_STRIPE_STATUSES
+from users.utils.stripe_utils import get_stripe
+from users.webhooks.webhook_handlers import handle_subscription_updates_batch
+
+
+def _subscription_rank(subscription):
+    """
+    Sort key for picking a customer's subscription: active/trialing first, then newest.
+    
+    Args:
+        subscription: Subscription dict
+    
+    Returns:
+        tuple: Higher ranks win
+    """
+    return (subscription.get('status') in ACTIVE_STRIPE_STATUSES, subscription.get('created') or 0)
+
+
+def _trim_subscription(subscription):
+    """
+    Keep only the fields handle_subscription_updates_batch() reads.
+    
+    Args:
+        subscription: Stripe subscription object
+    
+    Returns:
+        dict: Plain subscription dict, as the webhook view passes them
+    """
+    data = subscription.to_dict()
+    items = (data.get('items') or {}).get('data') or []
+    return {
+        'id': data.get('id'),
+        'customer': data.get('customer'),
+        'status': data.get('status'),
+        'created': data.get('created'),
+        'items': {'data': [{'price': {'id': items[0]['price']['id']}}]} if items else None,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Sync user subscription status and plan from Stripe in batches'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of subscriptions applied per database batch (default: 500)'
+        )
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        stripe = get_stripe()
+        
+        # Stream the pages and keep one trimmed subscription per customer: an
+        # active/trialing one over any other, then the newest, regardless of
+        # the order Stripe lists them in
+        chosen = {}
+        subscriptions = stripe.Subscription.list(status='all', limit=100)
+        for subscription in subscriptions.auto_paging_iter():
+            subscription = _trim_subscription(subscription)
+            customer_id = subscription['customer']
+            if not customer_id:
+                continue
+            current = chosen.get(customer_id)
+            if current is None or _subscription_rank(subscription) > _subscription_rank(current):
+                chosen[customer_id] = subscription
+        
+        updated = 0
+        batch = []
+        for subscription in chosen.values():
+            batch.append(subscription)
+            if len(batch) >= batch_size:
+                updated += handle_subscription_updates_batch(batch, batch_size)
+                batch = []
+        if batch:
+            updated += handle_subscription_updates_batch(batch, batch_size)
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Synced subscriptions for {updated} user(s)'))
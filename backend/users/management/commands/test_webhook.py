@@ -11,7 +11,55 @@ from users.webhooks.webhook_handlers import (
     handle_invoice_paid,
     handle_invoice_payment_failed
 )
-import json
+
+# Handler and display label per event type
+HANDLERS = {
+    'subscription.created': (handle_subscription_created, 'Subscription created'),
+    'subscription.updated': (handle_subscription_updated, 'Subscription updated'),
+    'subscription.deleted': (handle_subscription_deleted, 'Subscription deleted'),
+    'invoice.paid': (handle_invoice_paid, 'Invoice paid'),
+    'invoice.payment_failed': (handle_invoice_payment_failed, 'Invoice payment failed'),
+}
+
+
+# Per-event fields of the mock Stripe objects, merged over the common
+# customer/subscription fields (shallow merge: no deepcopy of nested templates)
+MOCK_TEMPLATES = {
+    'subscription.created': {'id': 'sub_test_123', 'status': 'active'},
+    'subscription.updated': {'status': 'active'},
+    'subscription.deleted': {},
+    'invoice.paid': {'id': 'in_test_123', 'amount_paid': 1000},  # $10.00 in cents
+    'invoice.payment_failed': {'id': 'in_test_123'},
+}
+
+# Setting holding the price ID put on the mock subscription's first item
+MOCK_PRICE_SETTINGS = {
+    'subscription.created': 'STRIPE_BASIC_PLAN_PRICE_ID',
+    'subscription.updated': 'STRIPE_PRO_PLAN_PRICE_ID',
+}
+
+
+def _mock_event_data(event_type, customer_id, user):
+    """
+    Build the mock Stripe object for an event type.
+    
+    Args:
+        event_type: One of the HANDLERS keys
+        customer_id: Stripe customer ID to put on the object
+        user: User the event is for
+        
+    Returns:
+        dict: Mock Stripe subscription or invoice object
+    """
+    data = {
+        'customer': customer_id,
+        'id': user.stripe_subscription_id or 'sub_test_123',
+        **MOCK_TEMPLATES[event_type],
+    }
+    price_setting = MOCK_PRICE_SETTINGS.get(event_type)
+    if price_setting:
+        data['items'] = {'data': [{'price': {'id': getattr(settings, price_setting)}}]}
+    return data
 
 
 class Command(BaseCommand):
@@ -21,13 +69,7 @@ class Command(BaseCommand):
         parser.add_argument(
             'event_type',
             type=str,
-            choices=[
-                'subscription.created',
-                'subscription.updated',
-                'subscription.deleted',
-                'invoice.paid',
-                'invoice.payment_failed'
-            ],
+            choices=list(HANDLERS),
             help='Type of webhook event to test'
         )
         parser.add_argument(
@@ -58,66 +100,12 @@ class Command(BaseCommand):
         
         self.stdout.write(f'Testing webhook: {event_type} for customer: {customer_id}')
         
-        # Create mock event data based on event type
-        if event_type == 'subscription.created':
-            mock_data = {
-                'customer': customer_id,
-                'id': 'sub_test_123',
-                'status': 'active',
-                'items': {
-                    'data': [{
-                        'price': {
-                            'id': settings.STRIPE_BASIC_PLAN_PRICE_ID
-                        }
-                    }]
-                }
-            }
-            handle_subscription_created(mock_data)
-            self.stdout.write(self.style.SUCCESS('✓ Subscription created handler executed'))
-            
-        elif event_type == 'subscription.updated':
-            mock_data = {
-                'customer': customer_id,
-                'id': user.stripe_subscription_id or 'sub_test_123',
-                'status': 'active',
-                'items': {
-                    'data': [{
-                        'price': {
-                            'id': settings.STRIPE_PRO_PLAN_PRICE_ID
-                        }
-                    }]
-                }
-            }
-            handle_subscription_updated(mock_data)
-            self.stdout.write(self.style.SUCCESS('✓ Subscription updated handler executed'))
-            
-        elif event_type == 'subscription.deleted':
-            mock_data = {
-                'customer': customer_id,
-                'id': user.stripe_subscription_id or 'sub_test_123'
-            }
-            handle_subscription_deleted(mock_data)
-            self.stdout.write(self.style.SUCCESS('✓ Subscription deleted handler executed'))
-            
-        elif event_type == 'invoice.paid':
-            mock_data = {
-                'customer': customer_id,
-                'amount_paid': 1000,  # $10.00 in cents
-                'id': 'in_test_123'
-            }
-            handle_invoice_paid(mock_data)
-            self.stdout.write(self.style.SUCCESS('✓ Invoice paid handler executed'))
-            
-        elif event_type == 'invoice.payment_failed':
-            mock_data = {
-                'customer': customer_id,
-                'id': 'in_test_123'
-            }
-            handle_invoice_payment_failed(mock_data)
-            self.stdout.write(self.style.SUCCESS('✓ Invoice payment failed handler executed'))
+        handler, label = HANDLERS[event_type]
+        handler(_mock_event_data(event_type, customer_id, user))
+        self.stdout.write(self.style.SUCCESS(f'✓ {label} handler executed'))
         
-        # Refresh user to show updated data
-        user.refresh_from_db()
+        # Reload only the fields shown below
+        user.refresh_from_db(fields=['current_plan', 'subscription_status', 'total_amount_paid'])
         self.stdout.write(f'\nUpdated user data:')
         self.stdout.write(f'  Plan: {user.current_plan}')
         self.stdout.write(f'  Status: {user.subscription_status}')
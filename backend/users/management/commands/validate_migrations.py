@@ -5,8 +5,9 @@ This command checks for common migration issues and validates that
 models are properly configured.
 """
 from django.core.management.base import BaseCommand
-from django.core.management import call_command
+from django.core.checks.registry import registry
 from django.db import connection
+from django.db.migrations.loader import MigrationLoader
 from django.apps import apps
 import sys
 
@@ -40,8 +41,13 @@ class Command(BaseCommand):
         # Check for unapplied migrations
         self.stdout.write('\nChecking migration status...')
         try:
-            call_command('showmigrations', '--list', verbosity=0)
-            self.stdout.write(self.style.SUCCESS('✓ Migration status OK'))
+            loader = MigrationLoader(connection)
+            unapplied = [node for node in loader.graph.nodes if node not in loader.applied_migrations]
+            if unapplied:
+                warnings.append(f'{len(unapplied)} unapplied migration(s)')
+                self.stdout.write(self.style.WARNING(f'⚠ {len(unapplied)} unapplied migration(s)'))
+            else:
+                self.stdout.write(self.style.SUCCESS('✓ Migration status OK'))
         except Exception as e:
             warnings.append(f'Migration status check: {e}')
 
@@ -52,9 +58,10 @@ class Command(BaseCommand):
             User = apps.get_model('users', 'User')
             
             # Check for required fields
+            field_names = frozenset(field.name for field in User._meta.get_fields())
             required_fields = ['subscription_status', 'current_plan', 'total_amount_paid']
             for field_name in required_fields:
-                if not hasattr(User, field_name):
+                if field_name not in field_names:
                     errors.append(f'Missing required field: {field_name}')
                 else:
                     self.stdout.write(self.style.SUCCESS(f'  ✓ Field {field_name} exists'))
@@ -77,8 +84,17 @@ class Command(BaseCommand):
         # Run Django system checks
         self.stdout.write('\nRunning Django system checks...')
         try:
-            call_command('check', verbosity=0)
-            self.stdout.write(self.style.SUCCESS('✓ System checks passed'))
+            # Run the check registry directly rather than through the check
+            # command's argument parsing and report formatting
+            serious = [
+                message for message in registry.run_checks()
+                if message.is_serious() and not message.is_silenced()
+            ]
+            if serious:
+                errors.extend(f'System check {message.id}: {message.msg}' for message in serious)
+                self.stdout.write(self.style.ERROR(f'✗ {len(serious)} system check error(s)'))
+            else:
+                self.stdout.write(self.style.SUCCESS('✓ System checks passed'))
         except Exception as e:
             errors.append(f'System checks failed: {e}')
 
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='users_user_stripe__26a84b_idx',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='stripe_customer_id',
+            field=models.CharField(blank=True, help_text="Stripe customer ID (starts with 'cus_')", max_length=255, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='subscription_status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive')], default='inactive', help_text='Current subscription status', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('subscription_status', 'active')), fields=['current_plan'], name='idx_active_users'),
+        ),
+    ]
@@ -9,7 +9,7 @@ The model is split into multiple modules for better organization:
 - user_validators.py: Validation logic
 - user_helpers.py: Helper methods and properties
 """
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.db import models
 from django.core.validators import MinValueValidator
 from typing import Optional
@@ -30,6 +30,40 @@ from .utils.user_helpers import (
 )
 
 
+class UserManager(BaseUserManager):
+    """
+    User manager that loads only the columns needed to log in.
+    
+    ModelBackend looks users up through get_by_natural_key(), so every login
+    fetches just what password checking and the login response use; other
+    columns are loaded on first access.
+    """
+    
+    # Columns read after a login: ModelBackend and the permission/admin
+    # checks (is_active, is_staff, is_superuser), update_last_login() and
+    # password-hash upgrades (both save(), which runs validate_user_model()
+    # over the Stripe IDs), and AuthService.login_user's response. Anything
+    # left out here costs an extra SELECT when it is touched
+    AUTH_FIELDS = (
+        'id',
+        'username',
+        'password',
+        'last_login',
+        'is_active',
+        'is_staff',
+        'is_superuser',
+        'email',
+        'subscription_status',
+        'current_plan',
+        'total_amount_paid',
+        'stripe_customer_id',
+        'stripe_subscription_id',
+    )
+    
+    def get_by_natural_key(self, username):
+        return self.only(*self.AUTH_FIELDS).get(**{self.model.USERNAME_FIELD: username})
+
+
 class User(AbstractUser):
     """
     Custom User model with subscription tracking.
@@ -54,7 +88,7 @@ class User(AbstractUser):
         choices=SUBSCRIPTION_STATUS_CHOICES,
         default=SUBSCRIPTION_STATUS_INACTIVE,
         help_text="Current subscription status",
-        db_index=True,  # Index for faster queries
+        # No single-column index: leading column of the (status, plan) index
     )
     
     current_plan = models.CharField(
@@ -76,9 +110,8 @@ class User(AbstractUser):
         max_length=255,
         blank=True,
         null=True,
-        unique=True,  # Each Stripe customer should map to one user
+        unique=True,  # Each Stripe customer should map to one user (also the lookup index)
         help_text="Stripe customer ID (starts with 'cus_')",
-        db_index=True,
     )
     
     stripe_subscription_id = models.CharField(
@@ -89,13 +122,20 @@ class User(AbstractUser):
         db_index=True,
     )
     
+    objects = UserManager()
+    
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         indexes = [
-            models.Index(fields=['stripe_customer_id']),
             models.Index(fields=['subscription_status', 'current_plan']),
             models.Index(fields=['email']),  # For email lookups
+            # Small partial index for the common "active subscribers" lookups
+            models.Index(
+                fields=['current_plan'],
+                name='idx_active_users',
+                condition=models.Q(subscription_status=SUBSCRIPTION_STATUS_ACTIVE),
+            ),
         ]
         constraints = [
             # Ensure total_amount_paid is never negative
@@ -124,7 +164,12 @@ class User(AbstractUser):
     
     def save(self, *args, **kwargs) -> None:
         """
-        Override save to run validation.
+        Override save to run the model's consistency checks.
+        
+        Only validate_user_model() runs here (in-memory, no queries). Full
+        field/uniqueness validation via full_clean() belongs at the input
+        boundary (admin forms, serializers); uniqueness and the non-negative
+        total are enforced by the database anyway.
         
         Args:
             *args: Positional arguments
@@ -132,7 +177,7 @@ class User(AbstractUser):
         """
         # Allow skipping validation for bulk operations or migrations
         if not kwargs.pop('skip_validation', False):
-            self.full_clean()  # Run model validation
+            validate_user_model(self)
         super().save(*args, **kwargs)
     
     @property
@@ -179,8 +224,8 @@ class User(AbstractUser):
         """
         Increment the total amount paid (in cents).
         
-        This method should be used instead of direct assignment to ensure
-        proper validation and logging.
+        This method should be used instead of direct assignment: it updates
+        the row atomically, so concurrent payments are never lost.
         
         Args:
             amount_cents: Amount to add in cents (must be >= 0)
@@ -0,0 +1,39 @@
+"""
+JSON renderer backed by orjson.
+
+Serializes DRF responses several times faster than the stdlib json module
+used by rest_framework.renderers.JSONRenderer. Dates and times are handed to
+DRF's encoder, so UTC datetimes keep its 'Z' suffix instead of orjson's
+'+00:00' and the output matches JSONRenderer's.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Handles the types orjson doesn't know (Decimal, lazy strings, querysets, ...)
+# and the dates/times passed through to keep DRF's formatting
+_fallback_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in JSONRenderer replacement that serializes with orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        """
+        Render data into JSON bytes.
+        
+        Args:
+            data: Response data
+            accepted_media_type: Negotiated media type (may request indentation)
+            renderer_context: DRF renderer context
+            
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        if data is None:
+            return b''
+        
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_fallback_encoder.default, option=option)
@@ -6,6 +6,8 @@ from typing import Literal
 from .models import User
 from .utils.constants import PLAN_BASIC, PLAN_PRO, PLAN_NONE
 
+VALID_PLANS = (PLAN_BASIC, PLAN_PRO, PLAN_NONE)
+
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -13,7 +15,8 @@ class UserSerializer(serializers.ModelSerializer):
     
     Includes computed lifetime_value field for easy frontend consumption.
     """
-    lifetime_value = serializers.SerializerMethodField()
+    # Plain field with a method source: no per-instance get_<field> dispatch
+    lifetime_value = serializers.FloatField(source='get_lifetime_value_dollars', read_only=True)
     
     class Meta:
         model = User
@@ -28,17 +31,28 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'total_amount_paid']
     
-    def get_lifetime_value(self, obj: User) -> float:
+    def to_representation(self, instance: User) -> dict:
         """
-        Return lifetime value formatted as dollars.
+        Build the output dict directly from model attributes.
+        
+        The field set is fixed, so this skips binding and walking the
+        declared fields on every serialization. Keep in sync with Meta.fields.
         
         Args:
-            obj: User instance
+            instance: User instance
             
         Returns:
-            float: Lifetime value in dollars
+            dict: Serialized user data
         """
-        return obj.get_lifetime_value_dollars()
+        return {
+            'id': instance.id,
+            'username': instance.username,
+            'email': instance.email,
+            'subscription_status': instance.subscription_status,
+            'current_plan': instance.current_plan,
+            'total_amount_paid': instance.total_amount_paid,
+            'lifetime_value': instance.get_lifetime_value_dollars(),
+        }
 
 
 class SubscriptionUpdateSerializer(serializers.Serializer):
@@ -47,28 +61,8 @@ class SubscriptionUpdateSerializer(serializers.Serializer):
     
     Validates plan selection for upgrade/downgrade/cancel operations.
     """
+    # ChoiceField rejects anything outside VALID_PLANS on its own
     plan = serializers.ChoiceField(
-        choices=[PLAN_BASIC, PLAN_PRO, PLAN_NONE],
+        choices=VALID_PLANS,
         help_text="Target plan: 'basic', 'pro', or 'none' (cancel)"
     )
-    
-    def validate_plan(self, value: str) -> str:
-        """
-        Validate plan value.
-        
-        Args:
-            value: Plan string value
-            
-        Returns:
-            str: Validated plan value
-            
-        Raises:
-            serializers.ValidationError: If plan is invalid
-        """
-        valid_plans = [PLAN_BASIC, PLAN_PRO, PLAN_NONE]
-        if value not in valid_plans:
-            raise serializers.ValidationError(
-                f"Plan must be one of: {', '.join(valid_plans)}"
-            )
-        return value
-
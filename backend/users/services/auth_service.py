@@ -5,16 +5,34 @@ This service encapsulates all authentication-related business logic,
 separating it from view layer concerns.
 """
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from django.contrib.auth import authenticate
 from django.http import HttpRequest
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from ..models import User
 from ..serializers import UserSerializer
 
 logger = logging.getLogger(__name__)
 
+# Lazy import the token classes (simplejwt pulls in DRF and cryptography) so
+# code paths that never issue tokens don't pay for it
+_refresh_token_class: Optional[Any] = None
+
+
+def _get_refresh_token_class() -> Any:
+    """
+    Get the cache-blacklisted RefreshToken class, importing it on first use.
+    
+    Returns:
+        RefreshToken: users.authentication.RefreshToken
+    """
+    global _refresh_token_class
+    
+    if _refresh_token_class is None:
+        from ..authentication import RefreshToken
+        _refresh_token_class = RefreshToken
+    
+    return _refresh_token_class
+
 
 class AuthService:
     """
@@ -44,13 +62,16 @@ class AuthService:
         if not username or not password:
             logger.warning("Authentication attempt with missing credentials")
             return None
-        
+
+        # ModelBackend runs the password hasher even when the username does not
+        # exist, so failed logins take the same time either way; don't add a
+        # second dummy check_password() here, it would only double the cost
         user = authenticate(request, username=username, password=password)
         
         if user is None:
-            logger.warning(f"Failed authentication attempt for username: {username}")
+            logger.warning("Failed authentication attempt for username: %s", username)
         else:
-            logger.info(f"User {user.username} authenticated successfully")
+            logger.info("User %s authenticated successfully", user.username)
         
         return user
     
@@ -72,17 +93,17 @@ class AuthService:
             raise ValueError("Cannot generate tokens for None user")
         
         try:
-            refresh = RefreshToken.for_user(user)
+            refresh = _get_refresh_token_class().for_user(user)
             access_token = refresh.access_token
             
-            logger.debug(f"Generated JWT tokens for user {user.username}")
+            logger.debug("Generated JWT tokens for user %s", user.username)
             
             return {
                 'access': str(access_token),
                 'refresh': str(refresh),
             }
         except Exception as e:
-            logger.error(f"Error generating JWT tokens for user {user.username}: {e}")
+            logger.error("Error generating JWT tokens for user %s: %s", user.username, e)
             raise
     
     @staticmethod
@@ -102,17 +123,22 @@ class AuthService:
         if not refresh_token_string:
             raise ValueError("Refresh token is required")
         
+        from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+        
         try:
-            refresh_token = RefreshToken(refresh_token_string)
+            # Full verification (HS256 signature ~30µs plus the blacklist lookup)
+            # runs on every refresh; verified tokens are deliberately not cached
+            # so a revoked token is rejected on its next use
+            refresh_token = _get_refresh_token_class()(refresh_token_string)
             access_token = refresh_token.access_token
-            
+
             logger.debug("Successfully refreshed access token")
             return str(access_token)
         except TokenError as e:
-            logger.warning(f"Token refresh failed: {e}")
+            logger.warning("Token refresh failed: %s", e)
             raise InvalidToken("Invalid or expired refresh token")
         except Exception as e:
-            logger.error(f"Unexpected error refreshing token: {e}")
+            logger.error("Unexpected error refreshing token: %s", e)
             raise InvalidToken("Error refreshing token")
     
     @staticmethod
@@ -130,15 +156,17 @@ class AuthService:
             logger.warning("Attempted to blacklist empty token")
             return
         
+        from rest_framework_simplejwt.exceptions import TokenError
+        
         try:
-            refresh_token = RefreshToken(refresh_token_string)
+            refresh_token = _get_refresh_token_class()(refresh_token_string)
             refresh_token.blacklist()
             logger.info("Refresh token blacklisted successfully")
         except TokenError as e:
-            logger.warning(f"Error blacklisting token: {e}")
+            logger.warning("Error blacklisting token: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error blacklisting token: {e}")
+            logger.error("Unexpected error blacklisting token: %s", e)
             raise TokenError("Error blacklisting token")
     
     @staticmethod
@@ -167,9 +195,9 @@ class AuthService:
         
         try:
             tokens = AuthService.generate_jwt_tokens(user)
-            user_data = UserSerializer(user).data
+            user_data = UserSerializer().to_representation(user)
             
-            logger.info(f"User {user.username} logged in successfully with JWT")
+            logger.info("User %s logged in successfully with JWT", user.username)
             
             return {
                 'access': tokens['access'],
@@ -177,7 +205,7 @@ class AuthService:
                 'user': user_data,
             }, None
         except Exception as e:
-            logger.error(f"Error during login for user {username}: {e}")
+            logger.error("Error during login for user %s: %s", username, e)
             return None, 'Error generating authentication tokens'
     
     @staticmethod
@@ -185,6 +213,10 @@ class AuthService:
         """
         Logout a user by blacklisting their refresh token.
         
+        The current access token is not revoked; it expires within
+        ACCESS_TOKEN_LIFETIME and cannot be renewed once the refresh token
+        is blacklisted.
+        
         Args:
             refresh_token_string: Optional refresh token to blacklist
             
@@ -202,6 +234,5 @@ class AuthService:
             AuthService.blacklist_refresh_token(refresh_token_string)
             return True, None
         except Exception as e:
-            logger.error(f"Error during logout: {e}")
+            logger.error("Error during logout: %s", e)
             return False, 'Error logging out'
-
@@ -8,9 +8,10 @@ operations by delegating to specialized modules:
 - subscription_canceller.py: Canceling subscriptions
 - subscription_validator.py: Validating and retrieving subscriptions
 """
-from typing import Literal
+from typing import Any, Literal, Optional
 import logging
-from django.db import transaction
+import uuid
+from django.core.cache import cache
 
 from ..models import User
 from ..utils.stripe_utils import get_stripe
@@ -25,6 +26,42 @@ from ..subscription.subscription_validator import get_or_validate_subscription
 
 logger = logging.getLogger(__name__)
 
+# Plan changes for one user are serialized with a short cache lock instead of
+# a row lock, since no database transaction is held across the Stripe calls.
+# The timeout bounds how long a crashed worker can block the user
+SUBSCRIPTION_LOCK_TIMEOUT = 30  # seconds
+
+# Stripe rejects idempotency keys longer than this
+STRIPE_IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Longest suffix appended to the request key (see the subscription modules)
+_STRIPE_KEY_SUFFIX_MAX_LENGTH = len(':subscription')
+
+# User columns re-read under the lock: the ones the plan change paths read,
+# plus total_amount_paid so the view can serialize the instance afterwards
+SUBSCRIPTION_FIELDS = [
+    'stripe_customer_id',
+    'stripe_subscription_id',
+    'current_plan',
+    'subscription_status',
+    'total_amount_paid',
+]
+
+
+def _stripe_request_key(user_id: int, target_plan: str, idempotency_key: Optional[str]) -> str:
+    """
+    Base for the idempotency keys sent with a plan change's Stripe writes.
+    
+    Deterministic for a given client key, so a retried change reuses the
+    same Stripe idempotency keys; falls back to a random key without one.
+    """
+    return f'{user_id}:{target_plan}:{idempotency_key or uuid.uuid4().hex}'
+
+
+def _subscription_lock_key(user_id: int) -> str:
+    """Cache key for the per-user plan change lock."""
+    return f'user:sub-lock:{user_id}'
+
 
 class SubscriptionService:
     """
@@ -38,56 +75,96 @@ class SubscriptionService:
     """
     
     @staticmethod
-    @transaction.atomic
     def handle_subscription_update(
         user: User,
-        target_plan: Literal['basic', 'pro', 'none']
+        target_plan: Literal['basic', 'pro', 'none'],
+        idempotency_key: Optional[str] = None
     ) -> None:
         """
         Main method to handle subscription updates (upgrade/downgrade/cancel).
         
-        Wraps the entire operation in a database transaction to ensure atomicity.
-        If any step fails, all changes are rolled back.
+        Runs without a surrounding database transaction: the Stripe calls
+        happen first and each path then writes the user row in a single
+        UPDATE, so no row lock or pooled connection is held across a
+        network call. Stripe writes carry idempotency keys derived from
+        idempotency_key: the dashboard sends one Idempotency-Key per plan
+        change and reuses it when that change is retried, so Stripe returns
+        the customer/subscription it already created instead of a second
+        one. Calls without a key get a random one and are not deduplicated.
         
         Args:
             user: User instance to update
             target_plan: Target plan ('basic', 'pro', or 'none' for cancel)
+            idempotency_key: Client-supplied key identifying this plan
+                change across retries; a random one is used when omitted
             
         Raises:
-            ValueError: If Stripe is not configured or plan is invalid
-            Exception: If subscription operation fails (transaction will rollback)
+            ValueError: If Stripe is not configured, the plan is invalid, the
+                idempotency key is too long for Stripe, or another change for
+                this user is still running
+            Exception: If subscription operation fails
         """
+        request_key = _stripe_request_key(user.pk, target_plan, idempotency_key)
+        if len(request_key) + _STRIPE_KEY_SUFFIX_MAX_LENGTH > STRIPE_IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValueError('Idempotency-Key is too long')
+        
+        # get_stripe() raises ValueError if the API key isn't configured
         stripe = get_stripe()
         
-        if not stripe.api_key:
-            raise ValueError('Failed to initialize Stripe API key.')
+        # Two overlapping changes (e.g. a double submit) could otherwise both
+        # see no subscription and create two
+        lock_key = _subscription_lock_key(user.pk)
+        lock_token = uuid.uuid4().hex
+        if not cache.add(lock_key, lock_token, SUBSCRIPTION_LOCK_TIMEOUT):
+            raise ValueError('Another subscription change is in progress, try again shortly')
+        try:
+            # request.user was loaded before the lock was taken; re-read the
+            # subscription columns so a change that just finished is seen
+            user.refresh_from_db(fields=SUBSCRIPTION_FIELDS)
+            SubscriptionService._apply_plan_change(user, stripe, target_plan, request_key)
+        finally:
+            # If the Stripe calls outlived the timeout the lock may now belong
+            # to another request; only release it while it is still ours
+            if cache.get(lock_key) == lock_token:
+                cache.delete(lock_key)
+    
+    @staticmethod
+    def _apply_plan_change(
+        user: User,
+        stripe: Any,
+        target_plan: Literal['basic', 'pro', 'none'],
+        request_key: str
+    ) -> None:
+        """
+        Run the cancel/update/create path for a plan change.
+        
+        Called by handle_subscription_update with the per-user lock held.
         
-        # Handle cancellation (within transaction)
+        Args:
+            user: User instance to update
+            stripe: Stripe API module
+            target_plan: Target plan ('basic', 'pro', or 'none' for cancel)
+            request_key: Base for the Stripe idempotency keys
+                (see _stripe_request_key)
+        """
+        # Handle cancellation
         if target_plan == PLAN_NONE:
             if user.stripe_subscription_id:
-                subscription = get_or_validate_subscription(user, stripe)
-                if subscription:
-                    # Cancel in Stripe and update DB (both in transaction)
-                    cancel_subscription(user, stripe, user.stripe_subscription_id)
-                else:
-                    # Invalid subscription ID, just update locally (in transaction)
-                    user.subscription_status = SUBSCRIPTION_STATUS_INACTIVE
-                    user.current_plan = PLAN_NONE
-                    user.save()
+                # Cancel in Stripe, then update the user. No retrieve first:
+                # an unknown ID is tolerated by the delete and the user is
+                # still cleared locally
+                cancel_subscription(user, stripe, user.stripe_subscription_id)
             else:
-                # No subscription to cancel (in transaction)
+                # No subscription to cancel
                 user.subscription_status = SUBSCRIPTION_STATUS_INACTIVE
                 user.current_plan = PLAN_NONE
-                user.save()
+                user.save(update_fields=['subscription_status', 'current_plan'])
             return
         
-        # Handle upgrade/downgrade or new subscription (within transaction)
+        # Handle upgrade/downgrade or new subscription
         subscription = get_or_validate_subscription(user, stripe)
         
         if subscription:
-            # Update existing subscription (transaction handled in method)
-            update_subscription_plan(user, stripe, subscription, target_plan)
+            update_subscription_plan(user, stripe, subscription, target_plan, request_key)
         else:
-            # Create new subscription (transaction handled in method)
-            create_subscription(user, stripe, target_plan)
-
+            create_subscription(user, stripe, target_plan, request_key)
@@ -5,14 +5,38 @@ This service encapsulates all user-related business logic,
 separating it from view layer concerns.
 """
 import logging
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from ..models import User
 from ..serializers import UserSerializer
 
 logger = logging.getLogger(__name__)
 UserModel = get_user_model()
 
+# Serialized user status is cached per user; saving or deleting the row
+# drops the entry (see users.signals)
+USER_STATUS_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+# Columns loaded by the get_user_by_* lookups: everything the services,
+# webhook handlers and UserSerializer read; other columns load on access
+USER_LOOKUP_FIELDS = (
+    'id',
+    'username',
+    'email',
+    'subscription_status',
+    'current_plan',
+    'total_amount_paid',
+    'stripe_customer_id',
+    'stripe_subscription_id',
+)
+
+
+def _user_status_cache_key(user_id: int) -> str:
+    """Cache key for a user's serialized status."""
+    return f'user:status:{user_id}'
+
 
 class UserService:
     """
@@ -38,9 +62,63 @@ class UserService:
         if user is None:
             raise ValueError("User cannot be None")
         
-        serializer = UserSerializer(user)
+        cache_key = _user_status_cache_key(user.pk)
+        user_data = cache.get(cache_key)
+        
+        if user_data is None:
+            # The caller's instance may predate a write that has since
+            # invalidated the key; cache a fresh read, not that instance, and
+            # never overwrite an entry another request stored meanwhile
+            fresh_user = User.objects.filter(pk=user.pk).first()
+            user_data = dict(UserSerializer(fresh_user or user).data)
+            if fresh_user is not None:
+                cache.add(cache_key, user_data, USER_STATUS_CACHE_TIMEOUT)
+        
         logger.debug(f"Retrieved user status for {user.username}")
-        return serializer.data
+        return user_data
+    
+    @staticmethod
+    def prime_user_status(user: User) -> Dict:
+        """
+        Serialize an up-to-date user instance and cache it as its status.
+        
+        For callers that just wrote the row through this instance and would
+        otherwise pay get_user_status()'s re-read on the following miss.
+        
+        Args:
+            user: User instance reflecting the row as just saved
+            
+        Returns:
+            Dictionary containing serialized user data with subscription status
+        """
+        user_data = dict(UserSerializer(user).data)
+        # add(), not set(): a concurrent writer's invalidation or a fresher
+        # entry must win over this instance
+        cache.add(_user_status_cache_key(user.pk), user_data, USER_STATUS_CACHE_TIMEOUT)
+        return user_data
+    
+    @staticmethod
+    def invalidate_user_status(user_id: int) -> None:
+        """
+        Drop a user's cached serialized status.
+        
+        Must be called after writes that bypass Model.save() (e.g. queryset
+        .update()), since those don't fire the post_save invalidation.
+        
+        Args:
+            user_id: Primary key of the user whose status changed
+        """
+        cache.delete(_user_status_cache_key(user_id))
+    
+    @staticmethod
+    def invalidate_user_statuses(user_ids: Iterable[int]) -> None:
+        """
+        Drop the cached serialized status of several users in one cache call.
+        
+        Args:
+            user_ids: Primary keys of the users whose status changed
+        """
+        cache.delete_many([_user_status_cache_key(user_id) for user_id in user_ids])
     
     @staticmethod
     def get_user_by_id(user_id: int) -> Optional[User]:
@@ -53,16 +131,12 @@ class UserService:
         Returns:
             User instance if found, None otherwise
         """
-        try:
-            user = UserModel.objects.get(pk=user_id)
-            logger.debug(f"Retrieved user by ID: {user_id}")
-            return user
-        except UserModel.DoesNotExist:
+        user = UserModel.objects.filter(pk=user_id).only(*USER_LOOKUP_FIELDS).first()
+        if user is None:
             logger.warning(f"User with ID {user_id} not found")
-            return None
-        except Exception as e:
-            logger.error(f"Error retrieving user by ID {user_id}: {e}")
-            raise
+        else:
+            logger.debug(f"Retrieved user by ID: {user_id}")
+        return user
     
     @staticmethod
     def get_user_by_username(username: str) -> Optional[User]:
@@ -78,22 +152,21 @@ class UserService:
         if not username:
             return None
         
-        try:
-            user = UserModel.objects.get(username=username)
-            logger.debug(f"Retrieved user by username: {username}")
-            return user
-        except UserModel.DoesNotExist:
+        user = UserModel.objects.filter(username=username).only(*USER_LOOKUP_FIELDS).first()
+        if user is None:
             logger.warning(f"User with username {username} not found")
-            return None
-        except Exception as e:
-            logger.error(f"Error retrieving user by username {username}: {e}")
-            raise
+        else:
+            logger.debug(f"Retrieved user by username: {username}")
+        return user
     
     @staticmethod
     def get_user_by_email(email: str) -> Optional[User]:
         """
         Retrieve a user by their email address.
         
+        Email is not unique on User; when several accounts share it, the
+        oldest one (lowest pk) is returned.
+        
         Args:
             email: Email address to look up
             
@@ -103,16 +176,12 @@ class UserService:
         if not email:
             return None
         
-        try:
-            user = UserModel.objects.get(email=email)
-            logger.debug(f"Retrieved user by email: {email}")
-            return user
-        except UserModel.DoesNotExist:
+        user = UserModel.objects.filter(email=email).only(*USER_LOOKUP_FIELDS).order_by('pk').first()
+        if user is None:
             logger.warning(f"User with email {email} not found")
-            return None
-        except Exception as e:
-            logger.error(f"Error retrieving user by email {email}: {e}")
-            raise
+        else:
+            logger.debug(f"Retrieved user by email: {email}")
+        return user
     
     @staticmethod
     def get_user_by_stripe_customer_id(
@@ -132,19 +201,15 @@ class UserService:
         if not stripe_customer_id:
             return None
         
-        try:
-            queryset = UserModel.objects.filter(stripe_customer_id=stripe_customer_id)
-            if select_for_update:
-                queryset = queryset.select_for_update()
-            user = queryset.get()
-            logger.debug(f"Retrieved user by Stripe customer ID: {stripe_customer_id}")
-            return user
-        except UserModel.DoesNotExist:
+        queryset = UserModel.objects.filter(stripe_customer_id=stripe_customer_id)
+        if select_for_update:
+            queryset = queryset.select_for_update()
+        user = queryset.only(*USER_LOOKUP_FIELDS).first()
+        if user is None:
             logger.warning(f"User with Stripe customer ID {stripe_customer_id} not found")
-            return None
-        except Exception as e:
-            logger.error(f"Error retrieving user by Stripe customer ID {stripe_customer_id}: {e}")
-            raise
+        else:
+            logger.debug(f"Retrieved user by Stripe customer ID: {stripe_customer_id}")
+        return user
     
     @staticmethod
     def serialize_user(user: User) -> Dict:
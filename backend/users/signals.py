@@ -0,0 +1,23 @@
+"""
+Signal receivers for the users app.
+
+Keeps cached user data consistent with the database.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User
+from .services.user_service import UserService
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_status_cache(sender, instance: User, **kwargs) -> None:
+    """
+    Drop the cached serialized status whenever a user row is written or deleted.
+    
+    Args:
+        sender: User model class
+        instance: User instance that was saved or deleted
+        **kwargs: Additional signal arguments
+    """
+    UserService.invalidate_user_status(instance.pk)
@@ -5,18 +5,17 @@ Handles canceling subscriptions in Stripe and updating user records.
 """
 from typing import Any
 import logging
-from django.db import transaction
 
 from ..models import User
 from ..utils.constants import (
     SUBSCRIPTION_STATUS_INACTIVE,
     PLAN_NONE,
 )
+from .subscription_validator import invalidate_cached_subscription
 
 logger = logging.getLogger(__name__)
 
 
-@transaction.atomic
 def cancel_subscription(
     user: User,
     stripe: Any,
@@ -25,29 +24,38 @@ def cancel_subscription(
     """
     Cancel a subscription in Stripe and update user.
     
-    Uses database transaction to ensure atomicity - either both operations
-    succeed or both are rolled back.
+    The Stripe delete runs outside any database transaction; the user row
+    is cleared afterwards in a single UPDATE.
     
     Args:
         user: User instance to update
         stripe: Stripe API module
         subscription_id: Stripe subscription ID to cancel
         
+    Raises:
+        stripe.error.StripeError: If the delete fails for any reason other
+            than the subscription no longer existing (user is left unchanged)
+        
     Note:
-        If subscription doesn't exist in Stripe, silently continues
-        and updates user locally.
+        If subscription doesn't exist in Stripe, continues and updates
+        user locally.
     """
     try:
         stripe.Subscription.delete(subscription_id)
         logger.info(f"Subscription {subscription_id} canceled in Stripe")
-    except Exception as e:
-        # Subscription already deleted or doesn't exist
-        logger.warning(f"Could not delete subscription {subscription_id}: {str(e)}")
+    except stripe.error.InvalidRequestError as e:
+        # Only a subscription that is already gone may be cleared locally;
+        # any other failure propagates and leaves the user row untouched,
+        # since the subscription may still be live and billing
+        if getattr(e, 'code', None) != 'resource_missing':
+            raise
+        logger.warning(f"Subscription {subscription_id} not found in Stripe: {str(e)}")
+    finally:
+        invalidate_cached_subscription(subscription_id)
     
-    # Update user within transaction
     user.subscription_status = SUBSCRIPTION_STATUS_INACTIVE
     user.current_plan = PLAN_NONE
     user.stripe_subscription_id = None
-    user.save()
+    user.save(update_fields=['subscription_status', 'current_plan', 'stripe_subscription_id'])
     logger.info(f"User {user.username} subscription canceled")
 
@@ -5,10 +5,10 @@ Handles creating new Stripe subscriptions and ensuring users have customer IDs.
 """
 from typing import Any, Literal
 import logging
-from django.db import transaction
 
 from ..models import User
 from ..utils.stripe_utils import get_plan_price_ids
+from .subscription_validator import cache_subscription
 from ..utils.constants import (
     SUBSCRIPTION_STATUS_ACTIVE,
     SUBSCRIPTION_STATUS_INACTIVE,
@@ -18,43 +18,50 @@ from ..utils.constants import (
 logger = logging.getLogger(__name__)
 
 
-@transaction.atomic
 def create_subscription(
     user: User,
     stripe: Any,
-    target_plan: Literal['basic', 'pro']
+    target_plan: Literal['basic', 'pro'],
+    idempotency_key: str
 ) -> Any:
     """
     Create a new subscription for a user.
     
-    Uses database transaction to ensure atomicity. If Stripe call succeeds
-    but database save fails, the transaction will rollback.
+    The Stripe calls run outside any database transaction; the user row is
+    written once, afterwards. Stripe writes carry idempotency keys, so
+    retrying the same request after a failed save returns the objects that
+    were already created instead of duplicating them.
     
     Args:
         user: User instance to create subscription for
         stripe: Stripe API module
         target_plan: Plan to subscribe to ('basic' or 'pro')
+        idempotency_key: Per-request key the Stripe idempotency keys derive from
         
     Returns:
         stripe.Subscription: Created Stripe subscription object
         
     Raises:
         ValueError: If price ID is not configured
-        Exception: If Stripe API call fails (transaction will rollback)
+        Exception: If a Stripe API call fails
     """
-    # Ensure user has a Stripe customer ID (within transaction)
+    update_fields = ['stripe_subscription_id', 'current_plan', 'subscription_status']
+    
+    # Ensure user has a Stripe customer ID (saved together with the
+    # subscription fields below, in one UPDATE)
     if not user.stripe_customer_id:
         try:
             customer = stripe.Customer.create(
                 email=user.email,
-                metadata={'user_id': user.id}
+                metadata={'user_id': user.id},
+                idempotency_key=f'{idempotency_key}:customer',
             )
             user.stripe_customer_id = customer.id
-            user.save()
+            update_fields.append('stripe_customer_id')
             logger.info(f"Created Stripe customer {customer.id} for user {user.username}")
         except Exception as e:
             logger.error(f"Failed to create Stripe customer: {str(e)}")
-            raise  # Transaction will rollback
+            raise
     
     plan_price_ids = get_plan_price_ids()
     price_id = plan_price_ids.get(target_plan)
@@ -70,13 +77,15 @@ def create_subscription(
             payment_behavior='default_incomplete',
             payment_settings={'save_default_payment_method': 'on_subscription'},
             expand=['latest_invoice.payment_intent'],
+            idempotency_key=f'{idempotency_key}:subscription',
         )
         logger.info(f"Created subscription {subscription.id} for user {user.username}")
+        cache_subscription(subscription)
     except Exception as e:
         logger.error(f"Failed to create subscription: {str(e)}")
-        raise  # Transaction will rollback
+        raise
     
-    # Update user within same transaction
+    # Single UPDATE after the Stripe calls; no transaction needed for it
     user.stripe_subscription_id = subscription.id
     user.current_plan = target_plan
     
@@ -87,6 +96,6 @@ def create_subscription(
         # Will be activated by webhook when payment is confirmed
         user.subscription_status = SUBSCRIPTION_STATUS_INACTIVE
     
-    user.save()
+    user.save(update_fields=update_fields)
     return subscription
 
@@ -3,38 +3,39 @@ Subscription update operations.
 
 Handles updating existing subscriptions to new plans.
 """
-from typing import Any, Literal
+from typing import Any, Dict, Literal, Optional
 import logging
-from django.db import transaction
 
 from ..models import User
 from ..utils.stripe_utils import get_plan_price_ids
+from .subscription_validator import cache_subscription
 
 logger = logging.getLogger(__name__)
 
 
-@transaction.atomic
 def update_subscription_plan(
     user: User,
     stripe: Any,
-    subscription: Any,
-    target_plan: Literal['basic', 'pro']
+    subscription: Dict[str, Optional[str]],
+    target_plan: Literal['basic', 'pro'],
+    idempotency_key: str
 ) -> None:
     """
     Update an existing subscription to a new plan.
     
-    Uses database transaction to ensure atomicity between Stripe update
-    and database update.
+    The Stripe update runs outside any database transaction and the user
+    row is saved only once it succeeded.
     
     Args:
         user: User instance to update
         stripe: Stripe API module
-        subscription: Stripe subscription object
+        subscription: Subscription summary from get_or_validate_subscription()
         target_plan: Target plan ('basic' or 'pro')
+        idempotency_key: Per-request key the Stripe idempotency key derives from
         
     Raises:
         ValueError: If price ID is not configured for the target plan
-        Exception: If Stripe API call fails (transaction will rollback)
+        Exception: If the Stripe API call fails
     """
     plan_price_ids = get_plan_price_ids()
     price_id = plan_price_ids.get(target_plan)
@@ -44,20 +45,23 @@ def update_subscription_plan(
     
     try:
         # Update subscription in Stripe
-        stripe.Subscription.modify(
-            subscription.id,
+        updated_subscription = stripe.Subscription.modify(
+            subscription['id'],
             items=[{
-                'id': subscription['items']['data'][0].id,
+                'id': subscription['item_id'],
                 'price': price_id,
             }],
             proration_behavior='always_invoice',
+            idempotency_key=f'{idempotency_key}:modify',
         )
-        logger.info(f"Subscription {subscription.id} updated to {target_plan} plan")
+        # Keep the cache warm for the next plan change
+        cache_subscription(updated_subscription)
+        logger.info(f"Subscription {subscription['id']} updated to {target_plan} plan")
     except Exception as e:
         logger.error(f"Failed to update subscription: {str(e)}")
-        raise  # Transaction will rollback
+        raise
     
-    # Update user within same transaction
+    # Single UPDATE after the Stripe call; no transaction needed for it
     user.current_plan = target_plan
-    user.save()
+    user.save(update_fields=['current_plan'])
 
@@ -3,52 +3,116 @@ Subscription validation and retrieval operations.
 
 Handles retrieving subscriptions from Stripe and validating subscription IDs.
 """
-from typing import Optional, Any
+from typing import Any, Dict, Optional
 import logging
-from django.db import transaction
+from django.core.cache import cache
 
 from ..models import User
 
 logger = logging.getLogger(__name__)
 
+# Retrieved Stripe subscriptions are cached briefly to skip the Stripe round
+# trip on repeat plan changes; writes and subscription webhooks drop the entry
+STRIPE_SUBSCRIPTION_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+def _subscription_cache_key(subscription_id: str) -> str:
+    """Cache key for a retrieved Stripe subscription."""
+    return f'stripe:sub:{subscription_id}'
+
+
+def _subscription_summary(subscription: Any) -> Dict[str, Optional[str]]:
+    """
+    Reduce a Stripe subscription to the fields plan changes read.
+    
+    StripeObjects carry the client's API key, so they must never be cached
+    as-is; this plain dict is what gets cached and handed to the updater.
+    
+    Args:
+        subscription: Stripe subscription object
+        
+    Returns:
+        dict: id, status, customer and item_id (first subscription item)
+    """
+    # Indexing only: newer stripe-python StripeObjects have no dict .get()
+    def field(obj, key):
+        return obj[key] if obj is not None and key in obj else None
+    
+    data = field(field(subscription, 'items'), 'data')
+    return {
+        'id': subscription['id'],
+        'status': field(subscription, 'status'),
+        'customer': field(subscription, 'customer'),
+        'item_id': data[0]['id'] if data else None,
+    }
+
+
+def cache_subscription(subscription: Any) -> Dict[str, Optional[str]]:
+    """
+    Cache a Stripe subscription returned by a create/retrieve/modify call.
+    
+    Args:
+        subscription: Stripe subscription object
+        
+    Returns:
+        dict: The cached subscription summary
+    """
+    summary = _subscription_summary(subscription)
+    cache.set(_subscription_cache_key(summary['id']), summary, STRIPE_SUBSCRIPTION_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_cached_subscription(subscription_id: Optional[str]) -> None:
+    """
+    Drop a cached Stripe subscription after it changed.
+    
+    Args:
+        subscription_id: Stripe subscription ID (no-op if empty)
+    """
+    if subscription_id:
+        cache.delete(_subscription_cache_key(subscription_id))
+
 
-@transaction.atomic
 def get_or_validate_subscription(
     user: User,
     stripe: Any
-) -> Optional[Any]:
+) -> Optional[Dict[str, Optional[str]]]:
     """
     Get subscription from Stripe or handle invalid subscription ID.
     
-    Uses transaction when clearing invalid subscription ID to ensure consistency.
+    Served from the cache when the subscription was retrieved recently.
     
     Args:
         user: User instance
         stripe: Stripe API module
         
     Returns:
-        Optional[stripe.Subscription]: Subscription object if found, None otherwise
+        Optional[dict]: Subscription summary (see _subscription_summary) if
+        found, None otherwise
         
     Note:
-        If subscription doesn't exist, clears the invalid ID from user within transaction.
+        If subscription doesn't exist, clears the invalid ID from the user.
     """
     if not user.stripe_subscription_id:
         return None
     
-    try:
-        subscription = stripe.Subscription.retrieve(user.stripe_subscription_id)
+    cache_key = _subscription_cache_key(user.stripe_subscription_id)
+    subscription = cache.get(cache_key)
+    if subscription is not None:
         return subscription
+    
+    try:
+        return cache_subscription(stripe.Subscription.retrieve(user.stripe_subscription_id))
     except stripe.error.InvalidRequestError:
         # Subscription doesn't exist in Stripe (might be test data)
-        # Clear within transaction
         logger.warning(
-            f"Subscription {user.stripe_subscription_id} not found in Stripe, "
-            f"clearing from user {user.username}"
+            "Subscription %s not found in Stripe, clearing from user %s",
+            user.stripe_subscription_id, user.username
         )
         user.stripe_subscription_id = None
-        user.save()
+        user.save(update_fields=['stripe_subscription_id'])
         return None
-    except Exception as e:
-        logger.error(f"Failed to retrieve subscription: {str(e)}")
-        raise Exception(f'Failed to retrieve subscription: {str(e)}')
-
+    except stripe.error.StripeError as e:
+        # Re-raise the original Stripe error (and traceback)
+        logger.error("Failed to retrieve subscription %s: %s", user.stripe_subscription_id, e)
+        raise
@@ -0,0 +1,296 @@
+"""
+Tests for the users app.
+"""
+import hashlib
+import hmac
+import json
+import pickle
+import time
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+import stripe
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import User
+from .services.subscription_service import SubscriptionService
+from .subscription.subscription_validator import get_or_validate_subscription
+from .views.webhook_views import MAX_WEBHOOK_PAYLOAD_BYTES
+from .webhooks.webhook_handlers import _customer_user_cache_key, handle_invoice_paid
+
+
+class _FakeStripe:
+    """Records the idempotency key of every Stripe write."""
+
+    def __init__(self):
+        self.keys = []
+        fake = self
+
+        class Customer:
+            @staticmethod
+            def create(**kwargs):
+                fake.keys.append(kwargs['idempotency_key'])
+                return SimpleNamespace(id='cus_test')
+
+        class Subscription:
+            @staticmethod
+            def create(**kwargs):
+                fake.keys.append(kwargs['idempotency_key'])
+                return stripe.Subscription.construct_from(
+                    {'id': 'sub_test', 'status': 'incomplete', 'customer': 'cus_test'}, 'sk_test_secret'
+                )
+
+        self.Customer = Customer
+        self.Subscription = Subscription
+
+
+@override_settings(
+    STRIPE_SECRET_KEY='sk_test',
+    STRIPE_BASIC_PLAN_PRICE_ID='price_basic',
+    STRIPE_PRO_PLAN_PRICE_ID='price_pro',
+)
+class SubscriptionIdempotencyTests(TestCase):
+    """Stripe idempotency keys sent by SubscriptionService."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='pw')
+        self.stripe = _FakeStripe()
+        patcher = mock.patch(
+            'users.services.subscription_service.get_stripe', return_value=self.stripe
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reset_user(self):
+        """Put the user back in the pre-change state, as after a failed save."""
+        User.objects.filter(pk=self.user.pk).update(
+            stripe_customer_id=None, stripe_subscription_id=None
+        )
+
+    def test_retried_change_reuses_idempotency_keys(self):
+        SubscriptionService.handle_subscription_update(self.user, 'basic', idempotency_key='req-1')
+        first = list(self.stripe.keys)
+        self._reset_user()
+        self.stripe.keys.clear()
+
+        SubscriptionService.handle_subscription_update(self.user, 'basic', idempotency_key='req-1')
+
+        self.assertEqual(len(first), 2)  # customer + subscription
+        self.assertEqual(self.stripe.keys, first)
+        self.assertTrue(first[0].startswith(f'{self.user.pk}:basic:req-1'))
+
+    def test_calls_without_client_key_are_not_deduplicated(self):
+        SubscriptionService.handle_subscription_update(self.user, 'basic')
+        first = list(self.stripe.keys)
+        self._reset_user()
+        self.stripe.keys.clear()
+
+        SubscriptionService.handle_subscription_update(self.user, 'basic')
+
+        self.assertNotEqual(self.stripe.keys, first)
+
+    def test_lock_taken_over_after_timeout_is_not_released(self):
+        lock_key = f'user:sub-lock:{self.user.pk}'
+
+        def slow_create(**kwargs):
+            # The lock expired mid-call and another request took it
+            cache.set(lock_key, 'other-request')
+            return SimpleNamespace(id='cus_test')
+
+        self.stripe.Customer.create = staticmethod(slow_create)
+        SubscriptionService.handle_subscription_update(self.user, 'basic', idempotency_key='req-2')
+
+        self.assertEqual(cache.get(lock_key), 'other-request')
+
+    def test_overlong_client_key_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, 'Idempotency-Key is too long'):
+            SubscriptionService.handle_subscription_update(self.user, 'basic', idempotency_key='k' * 255)
+
+        self.assertEqual(self.stripe.keys, [])
+
+
+class WebhookCustomerMappingTests(TestCase):
+    """Single-UPDATE webhook handlers and the cached customer -> user mapping."""
+
+    def setUp(self):
+        cache.clear()
+        self.old = User.objects.create_user(username='old', email='old@example.com', password='pw')
+        self.user = User.objects.create_user(username='bob', email='bob@example.com', password='pw')
+        User.objects.filter(pk=self.user.pk).update(stripe_customer_id='cus_bob', current_plan='basic')
+
+    def test_stale_mapping_is_refreshed_instead_of_hitting_wrong_user(self):
+        # Mapping cached while the customer ID belonged to another row
+        cache.set(_customer_user_cache_key('cus_bob'), (self.old.pk, 'old'))
+
+        handle_invoice_paid({'customer': 'cus_bob', 'amount_paid': 1500})
+
+        self.old.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.old.total_amount_paid, 0)
+        self.assertEqual(self.user.total_amount_paid, 1500)
+        self.assertEqual(cache.get(_customer_user_cache_key('cus_bob')), (self.user.pk, 'bob'))
+
+
+class SubscriptionCacheTests(TestCase):
+    """Retrieved Stripe subscriptions cached by subscription_validator."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='carol', email='carol@example.com', password='pw')
+        User.objects.filter(pk=self.user.pk).update(stripe_subscription_id='sub_c')
+        self.user.refresh_from_db()
+
+    def test_cached_subscription_holds_no_api_key(self):
+        retrieved = stripe.Subscription.construct_from({
+            'id': 'sub_c',
+            'status': 'active',
+            'customer': 'cus_c',
+            'items': {'object': 'list', 'data': [{'id': 'si_c', 'price': {'id': 'price_basic'}}]},
+        }, 'sk_test_secret')
+        fake_stripe = SimpleNamespace(
+            Subscription=SimpleNamespace(retrieve=mock.Mock(return_value=retrieved)),
+            error=stripe.error,
+        )
+
+        summary = get_or_validate_subscription(self.user, fake_stripe)
+        cached = cache.get('stripe:sub:sub_c')
+
+        self.assertEqual(
+            summary, {'id': 'sub_c', 'status': 'active', 'customer': 'cus_c', 'item_id': 'si_c'}
+        )
+        self.assertEqual(cached, summary)
+        self.assertIs(type(cached), dict)
+        self.assertNotIn(b'sk_test_secret', pickle.dumps(cached))
+        # Served from the cache the second time
+        self.assertEqual(get_or_validate_subscription(self.user, fake_stripe), summary)
+        fake_stripe.Subscription.retrieve.assert_called_once()
+
+
+def _stripe_subscription(sub_id, customer, status, created, price_id='price_basic'):
+    """Build a Stripe subscription object as Subscription.list() yields it."""
+    return stripe.Subscription.construct_from({
+        'id': sub_id,
+        'customer': customer,
+        'status': status,
+        'created': created,
+        'items': {'object': 'list', 'data': [{'id': f'si_{sub_id}', 'price': {'id': price_id}}]},
+    }, 'sk_test')
+
+
+@override_settings(
+    STRIPE_SECRET_KEY='sk_test',
+    STRIPE_BASIC_PLAN_PRICE_ID='price_basic',
+    STRIPE_PRO_PLAN_PRICE_ID='price_pro',
+)
+class SyncSubscriptionsCommandTests(TestCase):
+    """The sync_subscriptions management command."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='dave', email='dave@example.com', password='pw')
+        User.objects.filter(pk=self.user.pk).update(stripe_customer_id='cus_dave')
+
+    def _sync(self, subscriptions):
+        listing = mock.Mock()
+        listing.auto_paging_iter.return_value = iter(subscriptions)
+        with mock.patch.object(stripe.Subscription, 'list', return_value=listing) as list_mock:
+            call_command('sync_subscriptions', stdout=StringIO())
+        list_mock.assert_called_once_with(status='all', limit=100)
+        self.user.refresh_from_db()
+
+    def test_single_subscription_is_applied(self):
+        self._sync([_stripe_subscription('sub_1', 'cus_dave', 'active', 100, 'price_pro')])
+
+        self.assertEqual(self.user.stripe_subscription_id, 'sub_1')
+        self.assertEqual(self.user.current_plan, 'pro')
+        self.assertEqual(self.user.subscription_status, 'active')
+
+    def test_active_subscription_wins_over_newer_canceled_one(self):
+        self._sync([
+            _stripe_subscription('sub_old', 'cus_dave', 'active', 100, 'price_pro'),
+            _stripe_subscription('sub_new', 'cus_dave', 'canceled', 200),
+        ])
+
+        self.assertEqual(self.user.stripe_subscription_id, 'sub_old')
+        self.assertEqual(self.user.current_plan, 'pro')
+        self.assertEqual(self.user.subscription_status, 'active')
+
+    def test_newest_subscription_wins_when_none_is_active(self):
+        self._sync([
+            _stripe_subscription('sub_new', 'cus_dave', 'canceled', 200, 'price_pro'),
+            _stripe_subscription('sub_old', 'cus_dave', 'past_due', 100),
+        ])
+
+        self.assertEqual(self.user.stripe_subscription_id, 'sub_new')
+        self.assertEqual(self.user.current_plan, 'pro')
+        self.assertEqual(self.user.subscription_status, 'inactive')
+
+
+@override_settings(STRIPE_SECRET_KEY='sk_test', STRIPE_WEBHOOK_SECRET='whsec_test')
+class StripeWebhookViewTests(TestCase):
+    """Signature verification and dispatch in the Stripe webhook view."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='erin', email='erin@example.com', password='pw')
+        User.objects.filter(pk=self.user.pk).update(stripe_customer_id='cus_erin', current_plan='basic')
+
+    def _post(self, body, secret='whsec_test', signature=True):
+        if isinstance(body, str):
+            body = body.encode()
+        headers = {}
+        if signature:
+            timestamp = int(time.time())
+            digest = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+            headers['HTTP_STRIPE_SIGNATURE'] = f't={timestamp},v1={digest}'
+        return self.client.post(
+            reverse('stripe_webhook'), body, content_type='application/json', **headers
+        )
+
+    def _event(self, event_type, obj):
+        return json.dumps({'id': 'evt_1', 'object': 'event', 'type': event_type, 'data': {'object': obj}})
+
+    def test_missing_signature_is_rejected(self):
+        response = self._post(self._event('invoice.paid', {}), signature=False)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_signature_is_rejected(self):
+        response = self._post(self._event('invoice.paid', {}), secret='whsec_wrong')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid signature'})
+
+    def test_oversized_body_is_rejected(self):
+        body = self._event('invoice.paid', {'pad': 'x' * MAX_WEBHOOK_PAYLOAD_BYTES})
+
+        response = self._post(body)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid payload'})
+
+    def test_malformed_json_with_valid_signature_is_rejected(self):
+        response = self._post('{"type": "invoice.paid", ')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid payload'})
+
+    def test_valid_event_is_dispatched(self):
+        response = self._post(self._event('invoice.paid', {'customer': 'cus_erin', 'amount_paid': 2500}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'success'})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_amount_paid, 2500)
+        self.assertEqual(self.user.subscription_status, 'active')
+
+    def test_unhandled_event_is_acknowledged(self):
+        response = self._post(self._event('customer.created', {'id': 'cus_x'}))
+
+        self.assertEqual(response.status_code, 200)
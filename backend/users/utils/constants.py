@@ -13,8 +13,11 @@ PLAN_PRO: Final[str] = 'pro'
 PLAN_NONE: Final[str] = 'none'
 
 # Stripe subscription statuses that are considered active
-ACTIVE_STRIPE_STATUSES: Final[tuple] = ('active', 'trialing')
+ACTIVE_STRIPE_STATUSES: Final[frozenset] = frozenset({'active', 'trialing'})
 
 # Amount conversion
 CENTS_PER_DOLLAR: Final[int] = 100
 
+# Stripe object ID prefixes
+STRIPE_CUSTOMER_ID_PREFIX: Final[str] = 'cus_'
+STRIPE_SUBSCRIPTION_ID_PREFIX: Final[str] = 'sub_'
@@ -4,8 +4,11 @@ Stripe utility functions for initializing and managing Stripe API.
 This module provides a singleton pattern for Stripe initialization
 to avoid multiple imports and ensure API key is set correctly.
 """
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +21,9 @@ def get_stripe() -> Any:
     """
     Get Stripe module with API key configured (singleton pattern).
     
+    The module is imported and configured on the first call; later calls
+    just return it.
+    
     Returns:
         stripe: Initialized Stripe module with API key set
         
@@ -26,36 +32,41 @@ def get_stripe() -> Any:
     """
     global _stripe_module
     
-    if _stripe_module is None:
-        if not settings.STRIPE_SECRET_KEY:
-            raise ValueError("STRIPE_SECRET_KEY is not set in environment variables")
+    # Fast path: a single global read once initialized
+    if _stripe_module is not None:
+        return _stripe_module
+    
+    if not settings.STRIPE_SECRET_KEY:
+        raise ValueError("STRIPE_SECRET_KEY is not set in environment variables")
+    
+    try:
+        import stripe
+        # Set API key immediately after import
+        stripe.api_key = settings.STRIPE_SECRET_KEY
         
-        try:
-            import stripe
-            # Set API key immediately after import
-            stripe.api_key = settings.STRIPE_SECRET_KEY
-            
-            # Verify the key is set
-            if not stripe.api_key:
-                raise ValueError("Failed to set Stripe API key")
-            
-            _stripe_module = stripe
-            logger.info("Stripe module initialized successfully")
-            
-        except ImportError as e:
-            raise ValueError(f"Failed to import Stripe library: {str(e)}")
-        except Exception as e:
-            raise ValueError(f"Failed to initialize Stripe: {str(e)}")
-    elif not _stripe_module.api_key and settings.STRIPE_SECRET_KEY:
-        _stripe_module.api_key = settings.STRIPE_SECRET_KEY
+        # Verify the key is set
+        if not stripe.api_key:
+            raise ValueError("Failed to set Stripe API key")
+        
+        _stripe_module = stripe
+        logger.info("Stripe module initialized successfully")
+        
+    except ImportError as e:
+        raise ValueError(f"Failed to import Stripe library: {str(e)}")
+    except Exception as e:
+        raise ValueError(f"Failed to initialize Stripe: {str(e)}")
     
     return _stripe_module
 
 
+@lru_cache(maxsize=1)
 def get_plan_price_ids() -> Dict[str, Optional[str]]:
     """
     Get mapping of plan names to Stripe price IDs.
     
+    Built once per process: the price IDs come from settings and don't
+    change at runtime. The returned dict is shared, so don't mutate it.
+    
     Returns:
         dict: Mapping of plan names to price IDs
             {
@@ -69,12 +80,32 @@ def get_plan_price_ids() -> Dict[str, Optional[str]]:
     }
 
 
-def validate_stripe_config() -> List[str]:
+@lru_cache(maxsize=1)
+def get_plan_by_price_id() -> Dict[str, str]:
+    """
+    Get mapping of Stripe price IDs to plan names.
+    
+    The inverse of get_plan_price_ids(), used to resolve the plan of a
+    subscription received in a webhook. Unset price IDs are left out. Built
+    once per process; the returned dict is shared, so don't mutate it.
+    
+    Returns:
+        dict: Mapping of price IDs to plan names
+    """
+    return {price_id: plan for plan, price_id in get_plan_price_ids().items() if price_id}
+
+
+@lru_cache(maxsize=1)
+def validate_stripe_config() -> Tuple[str, ...]:
     """
     Validate that Stripe is properly configured.
     
+    Computed once per process (configuration is fixed at startup), so the
+    per-request check in the subscription view is a cached lookup. The
+    result is a tuple so the shared cached value can't be mutated.
+    
     Returns:
-        list: List of configuration errors (empty if all valid)
+        tuple: Configuration errors (empty if all valid)
         
     Example:
         >>> errors = validate_stripe_config()
@@ -95,5 +126,13 @@ def validate_stripe_config() -> List[str]:
     if errors:
         logger.warning(f"Stripe configuration errors: {errors}")
     
-    return errors
+    return tuple(errors)
+
 
+@receiver(setting_changed)
+def _clear_stripe_settings_caches(setting: str, **kwargs: Any) -> None:
+    """Drop the cached Stripe settings when a test overrides one of them."""
+    if setting.startswith('STRIPE_'):
+        get_plan_price_ids.cache_clear()
+        get_plan_by_price_id.cache_clear()
+        validate_stripe_config.cache_clear()
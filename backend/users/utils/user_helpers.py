@@ -4,6 +4,7 @@ User model helper methods and properties.
 Contains business logic methods for the User model.
 """
 from typing import Optional
+from django.db.models import F
 from .constants import (
     PLAN_NONE,
     SUBSCRIPTION_STATUS_ACTIVE,
@@ -57,8 +58,9 @@ def increment_lifetime_value(user, amount_cents: int) -> None:
     """
     Increment the total amount paid (in cents).
     
-    This method should be used instead of direct assignment to ensure
-    proper validation and logging.
+    Issues a single atomic UPDATE (total_amount_paid = total_amount_paid + n),
+    so concurrent webhook deliveries cannot lose increments. The in-memory
+    value is deferred afterwards and reloaded from the database on next access.
     
     Args:
         user: User model instance
@@ -67,8 +69,16 @@ def increment_lifetime_value(user, amount_cents: int) -> None:
     Raises:
         ValueError: If amount_cents is negative
     """
+    from ..services.user_service import UserService
+    
     if amount_cents < 0:
         raise ValueError("Amount must be non-negative")
-    user.total_amount_paid += amount_cents
-    user.save(update_fields=['total_amount_paid'])
+    type(user)._default_manager.filter(pk=user.pk).update(
+        total_amount_paid=F('total_amount_paid') + amount_cents
+    )
+    # Defer the stale value: the next access reloads it, and a later save()
+    # skips deferred fields instead of writing the old total back
+    user.__dict__.pop('total_amount_paid', None)
+    # Queryset updates bypass post_save, so drop the cached status explicitly
+    UserService.invalidate_user_status(user.pk)
 
@@ -7,6 +7,8 @@ from django.core.exceptions import ValidationError
 from .constants import (
     SUBSCRIPTION_STATUS_ACTIVE,
     PLAN_NONE,
+    STRIPE_CUSTOMER_ID_PREFIX,
+    STRIPE_SUBSCRIPTION_ID_PREFIX,
 )
 
 
@@ -21,13 +23,13 @@ def validate_user_model(user) -> None:
         ValidationError: If validation fails
     """
     # Validate Stripe customer ID format (if provided)
-    if user.stripe_customer_id and not user.stripe_customer_id.startswith('cus_'):
+    if user.stripe_customer_id and not user.stripe_customer_id.startswith(STRIPE_CUSTOMER_ID_PREFIX):
         raise ValidationError({
             'stripe_customer_id': 'Stripe customer ID must start with "cus_"'
         })
     
     # Validate Stripe subscription ID format (if provided)
-    if user.stripe_subscription_id and not user.stripe_subscription_id.startswith('sub_'):
+    if user.stripe_subscription_id and not user.stripe_subscription_id.startswith(STRIPE_SUBSCRIPTION_ID_PREFIX):
         raise ValidationError({
             'stripe_subscription_id': 'Stripe subscription ID must start with "sub_"'
         })
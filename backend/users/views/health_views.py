@@ -4,14 +4,17 @@ Health check endpoints for monitoring and deployment.
 Provides endpoints to check system health, database connectivity,
 and Stripe configuration status.
 """
-from django.http import JsonResponse
-from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.db import DatabaseError, connection
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The basic health payload never changes, so it is encoded once
+_HEALTH_BODY = b'{"status": "healthy", "service": "billing_portal"}'
+
 
 @csrf_exempt
 def health_check(request):
@@ -19,12 +22,9 @@ def health_check(request):
     Basic health check endpoint.
     
     Returns:
-        JsonResponse: Status 200 if healthy, 503 if unhealthy
+        HttpResponse: Static JSON body with status 200
     """
-    return JsonResponse({
-        'status': 'healthy',
-        'service': 'billing_portal',
-    })
+    return HttpResponse(_HEALTH_BODY, content_type='application/json')
 
 
 @csrf_exempt
@@ -45,8 +45,11 @@ def health_check_detailed(request):
     
     # Check database connection
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
+        # is_usable() pings on the raw driver connection, skipping Django's
+        # cursor wrapper and query logging; it still makes a real round trip
+        connection.ensure_connection()
+        if not connection.is_usable():
+            raise DatabaseError('Database connection is not usable')
         health_status['components']['database'] = {
             'status': 'healthy',
             'message': 'Database connection successful',
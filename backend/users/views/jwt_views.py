@@ -3,12 +3,16 @@ JWT authentication views.
 
 Provides JWT token-based authentication endpoints for API access.
 Business logic is delegated to AuthService.
+
+The endpoints only speak JSON: each binds a single parser and renderer so
+DRF doesn't walk the default parser/renderer lists on every request.
 """
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes, renderer_classes
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.views.decorators.csrf import csrf_exempt
+from ..renderers import ORJSONRenderer
 from ..services.auth_service import AuthService
 from ..services.user_service import UserService
 import logging
@@ -16,9 +20,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-@csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@parser_classes([JSONParser])
+@renderer_classes([ORJSONRenderer])
 def jwt_login(request):
     """
     JWT login endpoint.
@@ -38,8 +43,9 @@ def jwt_login(request):
             "user": { ... user data ... }
         }
     """
-    username = request.data.get('username')
-    password = request.data.get('password')
+    data = request.data
+    username = data.get('username')
+    password = data.get('password')
     
     if not username or not password:
         return Response(
@@ -47,7 +53,9 @@ def jwt_login(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Use AuthService for login logic
+    # Use AuthService for login logic. Password hashing (PBKDF2 via
+    # hashlib.pbkdf2_hmac) releases the GIL, so under a threaded server
+    # other requests keep being served while a login is hashing
     response_data, error_message = AuthService.login_user(request, username, password)
     
     if error_message:
@@ -59,14 +67,16 @@ def jwt_login(request):
     return Response(response_data)
 
 
-@csrf_exempt
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@parser_classes([JSONParser])
+@renderer_classes([ORJSONRenderer])
 def jwt_logout(request):
     """
     JWT logout endpoint.
     
-    Blacklists the refresh token to invalidate the session.
+    Blacklists the refresh token to invalidate the session; the short-lived
+    access token expires on its own.
     
     Request Body:
         {
@@ -79,7 +89,7 @@ def jwt_logout(request):
     success, error_message = AuthService.logout_user(refresh_token)
     
     if success:
-        logger.info(f"User {request.user.username} logged out (JWT token blacklisted)")
+        logger.info("User %s logged out (JWT token blacklisted)", request.user.username)
         return Response(
             {'detail': 'Successfully logged out'},
             status=status.HTTP_200_OK
@@ -91,9 +101,10 @@ def jwt_logout(request):
         )
 
 
-@csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@parser_classes([JSONParser])
+@renderer_classes([ORJSONRenderer])
 def jwt_refresh(request):
     """
     JWT token refresh endpoint.
@@ -124,16 +135,16 @@ def jwt_refresh(request):
             'access': access_token,
         })
     except Exception as e:
-        logger.error(f"Error refreshing JWT token: {e}")
+        logger.error("Error refreshing JWT token: %s", e)
         return Response(
             {'detail': 'Invalid or expired refresh token'},
             status=status.HTTP_401_UNAUTHORIZED
         )
 
 
-@csrf_exempt
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer])
 def jwt_verify(request):
     """
     JWT token verification endpoint.
@@ -4,14 +4,16 @@ Subscription management views for upgrading/downgrading plans.
 This module handles HTTP requests/responses for subscription operations.
 Business logic is delegated to SubscriptionService and UserService.
 """
+import orjson
+from django.http import HttpResponse
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.request import Request
-from django.views.decorators.csrf import csrf_exempt
 import logging
 from ..models import User
+from ..renderers import ORJSONRenderer
 from ..serializers import SubscriptionUpdateSerializer
 from ..utils.stripe_utils import validate_stripe_config
 from ..services.subscription_service import SubscriptionService
@@ -20,7 +22,10 @@ from ..services.user_service import UserService
 logger = logging.getLogger(__name__)
 
 
-def _user_status_view(request: Request) -> Response:
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer])
+def user_status(request: Request) -> HttpResponse:
     """
     Get current user's subscription status and stats.
     
@@ -28,22 +33,24 @@ def _user_status_view(request: Request) -> Response:
         request: HTTP request object
         
     Returns:
-        Response: User data including subscription status and lifetime value
+        HttpResponse: User data including subscription status and lifetime value
     """
-    # Use UserService for user status retrieval
+    # @api_view is kept for JWT auth; the cached flat dict is encoded here so
+    # DRF's Response rendering is skipped (the bound renderer only formats
+    # 401/403 errors)
     user_data = UserService.get_user_status(request.user)
-    return Response(user_data)
+    return HttpResponse(orjson.dumps(user_data), content_type='application/json')
 
 
-user_status = csrf_exempt(api_view(['GET'])(permission_classes([IsAuthenticated])(_user_status_view)))
-
-
-def _update_subscription_view(request: Request) -> Response:
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def update_subscription(request: Request) -> Response:
     """
     Handle upgrade/downgrade subscription logic.
     
     Args:
-        request: HTTP request with 'plan' in body
+        request: HTTP request with 'plan' in body and an optional
+            Idempotency-Key header (reused across retries of the same change)
         
     Returns:
         Response: Updated user data or error message
@@ -69,11 +76,16 @@ def _update_subscription_view(request: Request) -> Response:
     try:
         logger.info(f"User {user.username} updating subscription to {target_plan}")
         # Use service layer to handle subscription update
-        SubscriptionService.handle_subscription_update(user, target_plan)
+        SubscriptionService.handle_subscription_update(
+            user,
+            target_plan,
+            idempotency_key=request.headers.get('Idempotency-Key'),
+        )
         
-        # Refresh user from database using UserService
-        UserService.refresh_user_from_db(user)
-        user_data = UserService.get_user_status(user)
+        # The service re-read the subscription columns under its lock and the
+        # mutators updated them in place, so the response is built from this
+        # instance; priming the status cache saves the re-read on a miss
+        user_data = UserService.prime_user_status(user)
         logger.info(f"Subscription updated successfully for user {user.username}")
         return Response(user_data)
         
@@ -91,6 +103,3 @@ def _update_subscription_view(request: Request) -> Response:
             {'error': error_msg},
             status=status.HTTP_400_BAD_REQUEST
         )
-
-
-update_subscription = csrf_exempt(api_view(['POST'])(permission_classes([IsAuthenticated])(_update_subscription_view)))
@@ -1,9 +1,10 @@
 """
 Stripe webhook endpoint view.
 """
+import json
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.conf import settings
 from ..utils.stripe_utils import get_stripe
 from ..webhooks.webhook_handlers import (
@@ -14,46 +15,66 @@ from ..webhooks.webhook_handlers import (
     handle_invoice_payment_failed,
 )
 
+# Upper bound on an accepted webhook body; Stripe event payloads are far smaller
+MAX_WEBHOOK_PAYLOAD_BYTES = 512 * 1024
+
+# The success acknowledgement never changes, so it is encoded once
+_SUCCESS_BODY = b'{"status": "success"}'
+
+# Stripe event type -> handler, built once at import
+_EVENT_HANDLERS = {
+    'customer.subscription.created': handle_subscription_created,
+    'customer.subscription.updated': handle_subscription_updated,
+    'customer.subscription.deleted': handle_subscription_deleted,
+    'invoice.paid': handle_invoice_paid,
+    'invoice.payment_failed': handle_invoice_payment_failed,
+}
+
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def stripe_webhook(request):
     """Handle Stripe webhook events."""
-    # Get Stripe with API key configured
-    stripe = get_stripe()
-    if not stripe.api_key:
+    # Get Stripe with API key configured (raises ValueError if it isn't)
+    try:
+        stripe = get_stripe()
+    except ValueError:
         return JsonResponse({'error': 'Stripe not configured'}, status=500)
     
-    payload = request.body
-    sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
     webhook_secret = settings.STRIPE_WEBHOOK_SECRET
-    
     if not webhook_secret:
         return JsonResponse({'error': 'Webhook secret not configured'}, status=500)
     
+    # Reject unsigned, empty and oversized requests before reading the body
+    # and running the HMAC over it
+    sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
+    if not sig_header:
+        return JsonResponse({'error': 'Invalid signature'}, status=400)
     try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, webhook_secret
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if not 0 < content_length <= MAX_WEBHOOK_PAYLOAD_BYTES:
+        return JsonResponse({'error': 'Invalid payload'}, status=400)
+    
+    # Verify the signature with the SDK, but parse the payload ourselves:
+    # construct_event() would wrap every nested dict of the event in a
+    # StripeObject, and the handlers only need plain dicts
+    try:
+        payload = request.body.decode('utf-8')
+        stripe.WebhookSignature.verify_header(
+            payload, sig_header, webhook_secret, stripe.Webhook.DEFAULT_TOLERANCE
         )
+        event = json.loads(payload)
     except ValueError:
         return JsonResponse({'error': 'Invalid payload'}, status=400)
     except stripe.error.SignatureVerificationError:
         return JsonResponse({'error': 'Invalid signature'}, status=400)
     
-    # Handle the event
-    event_type = event['type']
-    data = event['data']['object']
-    
-    if event_type == 'customer.subscription.created':
-        handle_subscription_created(data)
-    elif event_type == 'customer.subscription.updated':
-        handle_subscription_updated(data)
-    elif event_type == 'customer.subscription.deleted':
-        handle_subscription_deleted(data)
-    elif event_type == 'invoice.paid':
-        handle_invoice_paid(data)
-    elif event_type == 'invoice.payment_failed':
-        handle_invoice_payment_failed(data)
+    # Handle the event; unhandled event types are acknowledged and ignored
+    handler = _EVENT_HANDLERS.get(event['type'])
+    if handler is not None:
+        handler(event['data']['object'])
     
-    return JsonResponse({'status': 'success'})
+    return HttpResponse(_SUCCESS_BODY, content_type='application/json')
 
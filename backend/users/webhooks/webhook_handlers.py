@@ -1,17 +1,128 @@
 """
 Webhook event handlers for Stripe events.
 
-All handlers use database transactions to ensure data consistency.
+Handlers that read-modify-write the user row lock it inside a database
+transaction; handlers whose changes fit a single UPDATE issue just that.
 Business logic for user retrieval is delegated to UserService.
 """
-from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
 from ..models import User
 from ..services.user_service import UserService
+from ..subscription.subscription_validator import invalidate_cached_subscription
+from ..utils.constants import ACTIVE_STRIPE_STATUSES
+from ..utils.stripe_utils import get_plan_by_price_id
+from ..utils.user_validators import validate_user_model
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stripe customer ID -> (pk, username) for the unlocked single-UPDATE
+# handlers. A customer ID is assigned to a user once, so hits stay valid;
+# misses are never cached (events can arrive before the ID is saved)
+STRIPE_CUSTOMER_USER_CACHE_TIMEOUT = 3600  # 1 hour
+
+
+def _customer_user_cache_key(customer_id):
+    """Cache key for the user owning a Stripe customer ID."""
+    return f'stripe:cus:{customer_id}'
+
+
+def _get_price_id(subscription):
+    """
+    Get the price ID of a subscription's first item.
+    
+    Args:
+        subscription: Stripe subscription object
+        
+    Returns:
+        str: Price ID, or None if the subscription carries no items
+    """
+    items = subscription.get('items')
+    data = items.get('data') if items else None
+    if not data:
+        return None
+    return data[0]['price']['id']
+
+
+def _get_user_ref(customer_id):
+    """
+    Look up the (pk, username) of the user with a Stripe customer ID.
+    
+    Served from the cache when possible; otherwise reads just the two
+    columns without a row lock. Used by _update_user_by_customer(), which
+    re-checks the customer ID in its UPDATE.
+    
+    Args:
+        customer_id: Stripe customer ID
+        
+    Returns:
+        tuple: (pk, username), or None if no user has this customer ID
+    """
+    if not customer_id:
+        return None
+    
+    cache_key = _customer_user_cache_key(customer_id)
+    user_ref = cache.get(cache_key)
+    if user_ref is None:
+        user_ref = (
+            User.objects.filter(stripe_customer_id=customer_id)
+            .values_list('pk', 'username')
+            .first()
+        )
+        if user_ref is not None:
+            cache.set(cache_key, tuple(user_ref), STRIPE_CUSTOMER_USER_CACHE_TIMEOUT)
+    return user_ref
+
+
+def _forget_user_ref(customer_id):
+    """
+    Drop a cached customer -> user mapping that no longer matches a row.
+    
+    Args:
+        customer_id: Stripe customer ID
+    """
+    cache.delete(_customer_user_cache_key(customer_id))
+
+
+def _update_user_by_customer(customer_id, **values):
+    """
+    Apply a single UPDATE to the user with a Stripe customer ID.
+    
+    The UPDATE matches on both the cached pk and the customer ID, so a
+    stale mapping (user deleted, or the customer ID moved to another row)
+    can never write to the wrong user. If it matches nothing, the mapping
+    is dropped and the update retried once against a fresh lookup.
+    
+    Args:
+        customer_id: Stripe customer ID
+        **values: Column values for QuerySet.update()
+        
+    Returns:
+        tuple: (pk, username) of the updated user, or None if no user has
+        this customer ID
+    """
+    user_ref = _get_user_ref(customer_id)
+    if not user_ref:
+        return None
+    
+    updated = User.objects.filter(pk=user_ref[0], stripe_customer_id=customer_id).update(**values)
+    if not updated:
+        # Cached mapping outlived the row it pointed at; look it up again
+        _forget_user_ref(customer_id)
+        user_ref = _get_user_ref(customer_id)
+        if not user_ref:
+            return None
+        updated = User.objects.filter(pk=user_ref[0], stripe_customer_id=customer_id).update(**values)
+        if not updated:
+            _forget_user_ref(customer_id)
+            return None
+    
+    # update() bypasses post_save, so drop the cached status here
+    UserService.invalidate_user_status(user_ref[0])
+    return user_ref
+
 
 @transaction.atomic
 def handle_subscription_created(subscription):
@@ -34,17 +145,12 @@ def handle_subscription_created(subscription):
         user.subscription_status = 'active'
         
         # Determine plan from price
-        if subscription.get('items') and subscription['items'].get('data'):
-            price_id = subscription['items']['data'][0]['price']['id']
-            if price_id == settings.STRIPE_BASIC_PLAN_PRICE_ID:
-                user.current_plan = 'basic'
-            elif price_id == settings.STRIPE_PRO_PLAN_PRICE_ID:
-                user.current_plan = 'pro'
+        price_id = _get_price_id(subscription)
+        if price_id:
+            user.current_plan = get_plan_by_price_id().get(price_id, user.current_plan)
         
-        user.save()
+        user.save(update_fields=['stripe_subscription_id', 'subscription_status', 'current_plan'])
         logger.info(f"Subscription {subscription_id} created for user {user.username}")
-    except Exception as e:
-        logger.warning(f"User not found for customer_id: {customer_id}")
     except Exception as e:
         logger.error(f"Error handling subscription.created: {str(e)}", exc_info=True)
         raise  # Re-raise to trigger transaction rollback
@@ -60,6 +166,7 @@ def handle_subscription_updated(subscription):
     customer_id = subscription.get('customer')
     subscription_id = subscription.get('id')
     status = subscription.get('status')
+    invalidate_cached_subscription(subscription_id)
     
     try:
         # Use UserService with select_for_update for transaction safety
@@ -70,92 +177,140 @@ def handle_subscription_updated(subscription):
         
         user.stripe_subscription_id = subscription_id
         
-        if status in ['active', 'trialing']:
+        if status in ACTIVE_STRIPE_STATUSES:
             user.subscription_status = 'active'
         else:
             user.subscription_status = 'inactive'
         
         # Update plan from price
-        if subscription.get('items') and subscription['items'].get('data'):
-            price_id = subscription['items']['data'][0]['price']['id']
-            if price_id == settings.STRIPE_BASIC_PLAN_PRICE_ID:
-                user.current_plan = 'basic'
-            elif price_id == settings.STRIPE_PRO_PLAN_PRICE_ID:
-                user.current_plan = 'pro'
+        price_id = _get_price_id(subscription)
+        if price_id:
+            user.current_plan = get_plan_by_price_id().get(price_id, user.current_plan)
         
-        user.save()
+        user.save(update_fields=['stripe_subscription_id', 'subscription_status', 'current_plan'])
         logger.info(f"Subscription {subscription_id} updated for user {user.username}")
-    except Exception as e:
-        logger.warning(f"User not found for customer_id: {customer_id}")
     except Exception as e:
         logger.error(f"Error handling subscription.updated: {str(e)}", exc_info=True)
         raise  # Re-raise to trigger transaction rollback
 
 
 @transaction.atomic
+def handle_subscription_updates_batch(subscriptions, batch_size=500):
+    """
+    Apply many subscription updates with one SELECT and batched UPDATEs.
+    
+    Equivalent to calling handle_subscription_updated() for each subscription
+    (the last one per customer wins), for replays and backfills where events
+    arrive in bulk. Live webhooks stay on the per-event handlers so each one
+    is persisted before Stripe gets its 200.
+    
+    Args:
+        subscriptions: Iterable of Stripe subscription objects
+        batch_size: Maximum number of rows per UPDATE statement
+        
+    Returns:
+        int: Number of users updated
+    """
+    latest = {}
+    for subscription in subscriptions:
+        invalidate_cached_subscription(subscription.get('id'))
+        if subscription.get('customer'):
+            latest[subscription['customer']] = subscription
+    if not latest:
+        return 0
+    
+    users = list(
+        User.objects.select_for_update().filter(stripe_customer_id__in=list(latest))
+    )
+    plan_by_price_id = get_plan_by_price_id()
+    
+    for user in users:
+        subscription = latest[user.stripe_customer_id]
+        user.stripe_subscription_id = subscription.get('id')
+        
+        if subscription.get('status') in ACTIVE_STRIPE_STATUSES:
+            user.subscription_status = 'active'
+        else:
+            user.subscription_status = 'inactive'
+        
+        price_id = _get_price_id(subscription)
+        if price_id:
+            user.current_plan = plan_by_price_id.get(price_id, user.current_plan)
+        
+        # bulk_update() bypasses save(), so run its checks here
+        validate_user_model(user)
+    
+    User.objects.bulk_update(
+        users,
+        ['stripe_subscription_id', 'subscription_status', 'current_plan'],
+        batch_size=batch_size,
+    )
+    # ...and post_save, so drop the cached statuses explicitly
+    UserService.invalidate_user_statuses(user.pk for user in users)
+    
+    missing = len(latest) - len(users)
+    if missing:
+        logger.warning(f"{missing} subscription(s) had no matching user")
+    logger.info(f"Batch-updated subscriptions for {len(users)} user(s)")
+    return len(users)
+
+
 def handle_subscription_deleted(subscription):
     """
     Handle subscription deleted event.
     
-    Uses database transaction to ensure atomicity of user updates.
+    The new values don't depend on the current row, so this is a single
+    UPDATE; no row lock or full-row save is needed.
     """
     customer_id = subscription.get('customer')
+    invalidate_cached_subscription(subscription.get('id'))
     
     try:
-        # Use UserService with select_for_update for transaction safety
-        user = UserService.get_user_by_stripe_customer_id(customer_id, select_for_update=True)
-        if not user:
+        user_ref = _update_user_by_customer(
+            customer_id,
+            subscription_status='inactive',
+            current_plan='none',
+            stripe_subscription_id=None,
+        )
+        if not user_ref:
             logger.warning(f"User not found for customer_id: {customer_id}")
             return
-        
-        user.subscription_status = 'inactive'
-        user.current_plan = 'none'
-        user.stripe_subscription_id = None
-        user.save()
-        logger.info(f"Subscription deleted for user {user.username}")
-    except Exception as e:
-        logger.warning(f"User not found for customer_id: {customer_id}")
+        logger.info(f"Subscription deleted for user {user_ref[1]}")
     except Exception as e:
         logger.error(f"Error handling subscription.deleted: {str(e)}", exc_info=True)
-        raise  # Re-raise to trigger transaction rollback
+        raise  # Re-raise so the webhook fails and Stripe retries it
 
 
-@transaction.atomic
 def handle_invoice_paid(invoice):
     """
     Handle invoice paid event - increment total_amount_paid.
     
-    Critical: Uses transaction and row-level locking to prevent race conditions
-    when incrementing total_amount_paid. This ensures accurate lifetime value tracking.
+    Critical: the increment is done in SQL (total_amount_paid + amount) by a
+    single UPDATE, so concurrent invoice events for the same customer can't
+    lose updates and no row lock is needed. This ensures accurate lifetime
+    value tracking.
     """
     customer_id = invoice.get('customer')
     amount_paid = invoice.get('amount_paid', 0)  # Amount in cents
     
     try:
-        # Use UserService with select_for_update for transaction safety
-        user = UserService.get_user_by_stripe_customer_id(customer_id, select_for_update=True)
-        if not user:
+        # Ensure subscription is active when invoice is paid, unless the user
+        # has no plan (validate_user_model rejects active without a plan)
+        user_ref = _update_user_by_customer(
+            customer_id,
+            total_amount_paid=F('total_amount_paid') + amount_paid,
+            subscription_status=Case(
+                When(~Q(current_plan='none'), then=Value('active')),
+                default=F('subscription_status'),
+            ),
+        )
+        if not user_ref:
             logger.warning(f"User not found for customer_id: {customer_id}")
             return
-        
-        # Increment total_amount_paid (stored in cents as integer)
-        # This is atomic within the transaction
-        user.total_amount_paid += amount_paid
-        
-        # Ensure subscription is active when invoice is paid
-        if user.subscription_status != 'active':
-            user.subscription_status = 'active'
-        
-        user.save()
-        logger.info(
-            f"Invoice paid: ${amount_paid/100:.2f} for user {user.username}. "
-            f"New lifetime value: ${user.get_lifetime_value_dollars():.2f}"
-        )
-    except Exception as e:
-        logger.warning(f"User not found for customer_id: {customer_id}")
+        logger.info(f"Invoice paid: ${amount_paid/100:.2f} for user {user_ref[1]}")
     except Exception as e:
         logger.error(f"Error handling invoice.paid: {str(e)}", exc_info=True)
-        raise  # Re-raise to trigger transaction rollback
+        raise  # Re-raise so the webhook fails and Stripe retries it
 
 
 @transaction.atomic
@@ -177,8 +332,6 @@ def handle_invoice_payment_failed(invoice):
         # Optionally mark subscription as inactive on payment failure
         # For now, we'll let Stripe handle the subscription status
         logger.info(f"Payment failed for customer: {customer_id}, user: {user.username}")
-    except Exception as e:
-        logger.warning(f"User not found for customer_id: {customer_id}")
     except Exception as e:
         logger.error(f"Error handling invoice.payment_failed: {str(e)}", exc_info=True)
         raise  # Re-raise to trigger transaction rollback
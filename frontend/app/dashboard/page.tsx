@@ -1,12 +1,19 @@
 'use client'
 
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { useRouter } from 'next/navigation'
 import apiClient from '@/lib/api'
 import { clearAuthTokens, getRefreshToken } from '@/lib/auth'
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
+// Idempotency key for a plan change; crypto.randomUUID is only available in
+// secure contexts (https / localhost)
+const newIdempotencyKey = () =>
+  typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function'
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+
 interface UserData {
   id: number
   username: string
@@ -24,6 +31,11 @@ export default function Dashboard() {
   const [error, setError] = useState<string | null>(null)
   const [success, setSuccess] = useState<string | null>(null)
   const [updating, setUpdating] = useState(false)
+  // One key per target plan, kept until a change succeeds so a retry after an
+  // error is deduplicated by Stripe instead of creating a duplicate. Any
+  // success clears them all: the state has moved on, and a stale key would
+  // make Stripe replay an old response for what is now a different change
+  const planChangeKeys = useRef<Partial<Record<string, string>>>({})
 
   useEffect(() => {
     fetchUserData()
@@ -68,8 +80,16 @@ export default function Dashboard() {
       setError(null)
       setSuccess(null)
       
+      const idempotencyKey = planChangeKeys.current[plan] ?? newIdempotencyKey()
+      planChangeKeys.current[plan] = idempotencyKey
+      
       // Use JWT-authenticated API client
-      const response = await apiClient.post('/api/user/subscription/', { plan })
+      const response = await apiClient.post(
+        '/api/user/subscription/',
+        { plan },
+        { headers: { 'Idempotency-Key': idempotencyKey } }
+      )
+      planChangeKeys.current = {}
       
       setUserData(response.data)
       const planName = plan === 'none' ? 'cancelled' : plan === 'basic' ? 'Basic Plan' : 'Pro Plan'